@@ -1,7 +1,7 @@
 
 from __future__ import annotations
 import asyncio, json
-from typing import AsyncIterator
+from typing import AsyncIterator, List
 from aiokafka import AIOKafkaProducer, AIOKafkaConsumer
 from agentic_core.bus import AbstractEventBus
 from agentic_core.events import Event
@@ -24,6 +24,25 @@ class KafkaBus(AbstractEventBus):
         await self._ensure()
         await self._producer.send_and_wait(self.topic, json.dumps(evt.to_dict()).encode())
 
+    async def publish_many(self, evts: List[Event], max_inflight: int = 32) -> List[bool]:
+        # enqueue into the producer's batches (at most max_inflight undelivered), then one flush
+        # instead of a round trip per event
+        await self._ensure()
+        sem = asyncio.Semaphore(max_inflight)
+        futs = []
+        for evt in evts:
+            await sem.acquire()
+            try:
+                fut = await self._producer.send(self.topic, json.dumps(evt.to_dict()).encode())
+            except Exception:
+                sem.release()
+                futs.append(None)
+                continue
+            fut.add_done_callback(lambda _: sem.release())
+            futs.append(fut)
+        await self._producer.flush()
+        return [f is not None and f.done() and not f.cancelled() and f.exception() is None for f in futs]
+
     async def subscribe(self) -> AsyncIterator[Event]:
         await self._ensure()
         try:
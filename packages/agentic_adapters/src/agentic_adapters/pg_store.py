@@ -1,6 +1,6 @@
 
 from __future__ import annotations
-import json
+import asyncio, json
 from typing import List, Tuple
 import asyncpg
 from agentic_core.store import AbstractEventStore
@@ -24,6 +24,14 @@ CREATE TABLE IF NOT EXISTS outbox (
   delivered BOOLEAN DEFAULT FALSE,
   ts DOUBLE PRECISION NOT NULL
 );
+CREATE OR REPLACE FUNCTION aob_outbox_notify() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('aob_outbox', '');
+  RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+CREATE OR REPLACE TRIGGER outbox_notify AFTER INSERT ON outbox
+  FOR EACH STATEMENT EXECUTE FUNCTION aob_outbox_notify();
 CREATE TABLE IF NOT EXISTS snapshots (
   snapshot_id TEXT PRIMARY KEY,
   correlation_id TEXT NOT NULL,
@@ -36,6 +44,9 @@ class PostgresEventStore(AbstractEventStore):
     def __init__(self, dsn: str):
         self.dsn = dsn
         self._pool: asyncpg.Pool | None = None
+        # dedicated LISTEN connection; pooled connections can't hold a listener
+        self._listen_conn: asyncpg.Connection | None = None
+        self._outbox_ready = asyncio.Event()
 
     async def _pool_get(self) -> asyncpg.Pool:
         if not self._pool:
@@ -118,3 +129,26 @@ class PostgresEventStore(AbstractEventStore):
         pool = await self._pool_get()
         async with pool.acquire() as c:
             await c.execute("UPDATE outbox SET delivered=TRUE WHERE id = ANY($1::text[])", ids)
+
+    def _on_outbox_notify(self, *_) -> None:
+        self._outbox_ready.set()
+
+    async def wait_for_outbox(self, timeout: float) -> None:
+        if self._listen_conn is None or self._listen_conn.is_closed():
+            await self._pool_get()  # make sure the notify trigger exists
+            self._listen_conn = await asyncpg.connect(self.dsn)
+            await self._listen_conn.add_listener("aob_outbox", self._on_outbox_notify)
+        try:
+            await asyncio.wait_for(self._outbox_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._outbox_ready.clear()
+
+    async def close(self) -> None:
+        if self._listen_conn is not None and not self._listen_conn.is_closed():
+            await self._listen_conn.remove_listener("aob_outbox", self._on_outbox_notify)
+            await self._listen_conn.close()
+        self._listen_conn = None
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
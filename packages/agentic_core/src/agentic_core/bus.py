@@ -1,13 +1,24 @@
 
 from __future__ import annotations
 import asyncio
-from typing import AsyncIterator
+from typing import AsyncIterator, List
 from .events import Event
 
 class AbstractEventBus:
     async def publish(self, evt: Event) -> None: ...
     async def subscribe(self) -> AsyncIterator[Event]: ...
 
+    async def publish_many(self, evts: List[Event], max_inflight: int = 32) -> List[bool]:
+        """Publish a batch; result i is True if evts[i] was delivered. Buses with a native batch path override this."""
+        sem = asyncio.Semaphore(max_inflight)
+
+        async def _publish(evt: Event) -> None:
+            async with sem:
+                await self.publish(evt)
+
+        results = await asyncio.gather(*(_publish(e) for e in evts), return_exceptions=True)
+        return [not isinstance(r, BaseException) for r in results]
+
 class InMemoryBus(AbstractEventBus):
     def __init__(self, maxsize: int = 1000):
         self._q: asyncio.Queue[Event] = asyncio.Queue(maxsize=maxsize)
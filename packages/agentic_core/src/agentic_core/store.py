@@ -1,5 +1,6 @@
 
 from __future__ import annotations
+import asyncio
 from typing import List, Tuple
 from .events import Event
 
@@ -13,11 +14,19 @@ class AbstractEventStore:
     async def fetch_outbox(self, limit: int = 100) -> List[Event]: ...
     async def mark_outbox_delivered(self, ids: List[str]) -> None: ...
 
+    async def wait_for_outbox(self, timeout: float) -> None:
+        """Return when new outbox rows may be available, or after `timeout` seconds"""
+        await asyncio.sleep(timeout)
+
+    async def close(self) -> None:
+        """Release connections held by the store"""
+
 class InMemoryStore(AbstractEventStore):
     def __init__(self):
         self._events: List[Event] = []
         self._snapshots: dict[str, List[Event]] = {}
         self._outbox: List[Event] = []
+        self._outbox_ready = asyncio.Event()
 
     async def append(self, evt: Event) -> None:
         if evt.idempotency_key and any(e.idempotency_key == evt.idempotency_key for e in self._events):
@@ -31,6 +40,7 @@ class InMemoryStore(AbstractEventStore):
             return False, evt
         self._events.append(evt)
         self._outbox.append(evt)
+        self._outbox_ready.set()
         return True, evt
 
     async def list(self, correlation_id: str) -> List[Event]:
@@ -54,3 +64,10 @@ class InMemoryStore(AbstractEventStore):
 
     async def mark_outbox_delivered(self, ids: List[str]) -> None:
         self._outbox = [e for e in self._outbox if e.id not in ids]
+
+    async def wait_for_outbox(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._outbox_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._outbox_ready.clear()
@@ -7,16 +7,54 @@ High-throughput OSS model serving with routing policies for cost/latency/safety-
 from __future__ import annotations
 import asyncio
 import json
+import math
 import time
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+from collections import Counter
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any
+from dataclasses import dataclass, field, fields
 from enum import Enum
 import httpx
 from pydantic import BaseModel, Field
 import logging
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import xxhash
+except Exception:  # pragma: no cover
+    xxhash = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+# Prefix-affinity routing: requests sharing a prompt prefix are pinned to the
+# replica most likely to hold that prefix in its KV cache.
+PREFIX_AFFINITY_CHARS = 512
+PREFIX_INDEX_TTL_SECS = 300.0
+PREFIX_INDEX_MAX_ENTRIES = 10000
+
+ROUTING_CACHE_MAX_ENTRIES = 1024
+
+# Upstream completion payload; only the prompt needs JSON escaping
+_BODY_TEMPLATE = b'{"prompt":%s,"max_tokens":%d,"temperature":%s,"top_p":%s,"stream":%s}'
+
+
+def _dumps_str(value: str) -> bytes:
+    """JSON-encode a string"""
+    if orjson is None:
+        return json.dumps(value).encode()
+    return orjson.dumps(value)
+
+
+def _prefix_hash(prompt: str) -> int:
+    """Hash the routing-relevant prompt prefix"""
+    prefix = prompt[:PREFIX_AFFINITY_CHARS]
+    if xxhash is None:
+        return hash(prefix)
+    return xxhash.xxh64(prefix).intdigest()
+
 
 class ModelTier(Enum):
     """Model performance tiers"""
@@ -32,7 +70,35 @@ class SafetyTier(Enum):
     MAXIMUM = "maximum"   # Maximum safety, restricted outputs
 
 
-@dataclass
+def _extract_completion(data: Dict[str, Any]) -> str:
+    """Text from an OpenAI-style /completions response (vLLM)"""
+    return data["choices"][0]["text"]
+
+
+def _extract_chat(data: Dict[str, Any]) -> str:
+    """Text from an OpenAI-style /chat/completions response"""
+    return data["choices"][0]["message"]["content"]
+
+
+def _extract_generic(data: Dict[str, Any]) -> str:
+    """Text from a response of unknown shape"""
+    if "choices" in data:
+        return data["choices"][0]["text"]
+    if "content" in data:
+        return data["content"]
+    return str(data)
+
+
+def _extractor_for(endpoint: str) -> Callable[[Dict[str, Any]], str]:
+    """Pick the response extractor for an endpoint's API schema"""
+    if endpoint.endswith("/chat/completions"):
+        return _extract_chat
+    if endpoint.endswith("/completions"):
+        return _extract_completion
+    return _extract_generic
+
+
+@dataclass(frozen=True, slots=True)
 class ModelProfile:
     """Model configuration profile"""
     name: str
@@ -46,9 +112,28 @@ class ModelProfile:
     context_window: int = 4096
     supports_streaming: bool = True
     supports_function_calling: bool = False
+    replicas: tuple[str, ...] = ()  # Additional endpoints serving the same model
+    
+    # Per-request constants derived once from the fields above
+    _headers: Dict[str, str] = field(init=False, repr=False, compare=False)
+    _urls: Dict[str, httpx.URL] = field(init=False, repr=False, compare=False)
+    _extract: Callable[[Dict[str, Any]], str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        object.__setattr__(self, "_headers", headers)
+        object.__setattr__(self, "_urls", {endpoint: httpx.URL(endpoint) for endpoint in self.endpoints})
+        object.__setattr__(self, "_extract", _extractor_for(self.endpoint))
+    
+    @property
+    def endpoints(self) -> tuple[str, ...]:
+        """All endpoints serving this model, primary first"""
+        return (self.endpoint, *self.replicas)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RoutingPolicy:
     """Model routing policy"""
     max_latency_ms: int = 5000
@@ -58,6 +143,9 @@ class RoutingPolicy:
     allow_fallback: bool = True
 
 
+_SAFETY_RANK = {SafetyTier.BASIC: 0, SafetyTier.ENHANCED: 1, SafetyTier.MAXIMUM: 2}
+
+
 class ModelRequest(BaseModel):
     """Model inference request"""
     prompt: str
@@ -85,17 +173,37 @@ class ModelGateway:
     
     def __init__(self):
         self.models: Dict[str, ModelProfile] = {}
-        self.routing_cache: Dict[str, str] = {}
         self.health_status: Dict[str, bool] = {}
         self._client = httpx.AsyncClient(timeout=30.0)
         
+        # Routing decisions keyed by a plain tuple of policy fields and token
+        # bucket. select_model never awaits, so this single-writer dict needs no
+        # lock; it is cleared on any health flip or registry change.
+        self._routing_cache: Dict[tuple, Optional[str]] = {}
+        
+        # Per-model circuit breaker: (consecutive failures, next probe monotonic ts)
+        self._breaker: Dict[str, tuple[int, float]] = {}
+        
+        # Prefix hash -> (endpoint, expiry monotonic ts), plus per-endpoint load/outcomes
+        self._prefix_index: Dict[int, tuple[str, float]] = {}
+        self._running_requests: Dict[str, int] = {}
+        self._endpoint_outcomes: Dict[str, tuple[int, int]] = {}  # (successes, total)
+        
+        # Registry aggregates maintained by _register for O(1) stats
+        self._tier_counts: Counter = Counter()
+        self._safety_counts: Counter = Counter()
+        self._total_cost: float = 0.0
+        
+        # (name, profile, safety rank) in ascending cost order for routing scans
+        self._by_cost: List[tuple[str, ModelProfile, int]] = []
+        
         # Initialize default models
         self._setup_default_models()
     
     def _setup_default_models(self):
         """Setup default model profiles"""
         # vLLM models (local)
-        self.models["llama-7b"] = ModelProfile(
+        self._register(ModelProfile(
             name="llama-7b",
             tier=ModelTier.CHEAP,
             safety_tier=SafetyTier.BASIC,
@@ -106,9 +214,9 @@ class ModelGateway:
             context_window=4096,
             supports_streaming=True,
             supports_function_calling=False
-        )
+        ))
         
-        self.models["llama-13b"] = ModelProfile(
+        self._register(ModelProfile(
             name="llama-13b",
             tier=ModelTier.BALANCED,
             safety_tier=SafetyTier.BASIC,
@@ -119,10 +227,10 @@ class ModelGateway:
             context_window=4096,
             supports_streaming=True,
             supports_function_calling=False
-        )
+        ))
         
         # Hosted models (examples)
-        self.models["gpt-3.5-turbo"] = ModelProfile(
+        self._register(ModelProfile(
             name="gpt-3.5-turbo",
             tier=ModelTier.BALANCED,
             safety_tier=SafetyTier.ENHANCED,
@@ -134,9 +242,9 @@ class ModelGateway:
             context_window=4096,
             supports_streaming=True,
             supports_function_calling=True
-        )
+        ))
         
-        self.models["gpt-4"] = ModelProfile(
+        self._register(ModelProfile(
             name="gpt-4",
             tier=ModelTier.QUALITY,
             safety_tier=SafetyTier.MAXIMUM,
@@ -148,83 +256,197 @@ class ModelGateway:
             context_window=8192,
             supports_streaming=True,
             supports_function_calling=True
+        ))
+    
+    def _register(self, model: ModelProfile):
+        """Add or replace a model profile, keeping registry aggregates current"""
+        previous = self.models.get(model.name)
+        if previous is not None:
+            self._tier_counts[previous.tier.value] -= 1
+            self._safety_counts[previous.safety_tier.value] -= 1
+            self._total_cost -= previous.cost_per_1k_tokens
+        
+        self.models[model.name] = model
+        self._tier_counts[model.tier.value] += 1
+        self._safety_counts[model.safety_tier.value] += 1
+        self._total_cost += model.cost_per_1k_tokens
+        self._by_cost = sorted(
+            ((name, profile, _SAFETY_RANK[profile.safety_tier]) for name, profile in self.models.items()),
+            key=lambda entry: entry[1].cost_per_1k_tokens
         )
+        self._routing_cache.clear()
     
     async def health_check(self, model_name: str) -> bool:
         """Check if a model is healthy and available"""
         if model_name not in self.models:
             return False
         
+        # Skip the probe while the breaker is open; report the last known status
+        fails, next_try_ts = self._breaker.get(model_name, (0, 0.0))
+        if time.monotonic() < next_try_ts:
+            return self.health_status.get(model_name, False)
+        
         model = self.models[model_name]
         
         try:
             # Simple health check request
             response = await self._client.get(f"{model.endpoint.replace('/completions', '/health')}")
             is_healthy = response.status_code == 200
-            self.health_status[model_name] = is_healthy
-            return is_healthy
         except Exception as e:
             logger.warning(f"Health check failed for {model_name}: {e}")
-            self.health_status[model_name] = False
-            return False
+            is_healthy = False
+        
+        if is_healthy:
+            self._breaker.pop(model_name, None)
+        else:
+            fails += 1
+            delay = min(60.0, 0.5 * 2 ** fails)
+            self._breaker[model_name] = (fails, time.monotonic() + delay)
+        
+        self._set_health(model_name, is_healthy)
+        return is_healthy
+    
+    async def health_check_all(self) -> Dict[str, bool]:
+        """Probe every model concurrently"""
+        names = list(self.models)
+        results = await asyncio.gather(
+            *[self.health_check(name) for name in names],
+            return_exceptions=True
+        )
+        return {
+            name: result is True
+            for name, result in zip(names, results)
+        }
+    
+    def _set_health(self, model_name: str, is_healthy: bool):
+        """Record health status, invalidating routing decisions when it changes"""
+        if self.health_status.get(model_name, True) != is_healthy:
+            self._routing_cache.clear()
+        self.health_status[model_name] = is_healthy
+    
+    @staticmethod
+    def _token_bucket(prompt: str) -> int:
+        """Bucket the estimated prompt size into power-of-two token bands"""
+        estimated_tokens = len(prompt.split()) * 1.3  # Rough estimate
+        return int(estimated_tokens).bit_length()
     
     def select_model(self, policy: RoutingPolicy, request: ModelRequest) -> Optional[str]:
         """Select the best model based on routing policy"""
-        cache_key = f"{policy.max_latency_ms}:{policy.max_cost_usd}:{policy.preferred_tier}:{policy.required_safety_tier}"
+        prompt_token_bucket = self._token_bucket(request.prompt)
+        cache_key = (
+            policy.max_latency_ms,
+            policy.max_cost_usd,
+            policy.preferred_tier,
+            policy.required_safety_tier,
+            policy.allow_fallback,
+            prompt_token_bucket
+        )
+        
+        try:
+            return self._routing_cache[cache_key]
+        except KeyError:
+            pass
+        
+        selected = self._select_model(policy, prompt_token_bucket)
+        if len(self._routing_cache) >= ROUTING_CACHE_MAX_ENTRIES:
+            self._routing_cache.pop(next(iter(self._routing_cache)))
+        self._routing_cache[cache_key] = selected
+        return selected
+    
+    def _select_model(self, policy: RoutingPolicy, prompt_token_bucket: int) -> Optional[str]:
+        """Routing decision for a policy and token bucket; cached by ``select_model``
         
-        if cache_key in self.routing_cache:
-            return self.routing_cache[cache_key]
+        Profiles are scanned in ascending cost order, so the first model that
+        satisfies the policy (preferring ``policy.preferred_tier``) wins
+        without building or sorting a candidate list.
+        """
+        # Cost is estimated against the bucket's upper bound
+        estimated_tokens = 1 << prompt_token_bucket
+        required_rank = _SAFETY_RANK[policy.required_safety_tier]
+        preferred_tier = policy.preferred_tier
         
-        # Filter models by policy constraints
-        candidates = []
+        best = None
+        fallback = None
+        fallback_preferred = None
         
-        for name, model in self.models.items():
+        for name, model, safety_rank in self._by_cost:
             # Check health status
             if not self.health_status.get(name, True):
                 continue
             
-            # Check latency constraint
+            # Cheapest healthy models, used when nothing satisfies the policy
+            if fallback is None:
+                fallback = name
+            if fallback_preferred is None and model.tier is preferred_tier:
+                fallback_preferred = name
+            
+            # Check latency, safety and estimated cost constraints
             if model.max_latency_ms > policy.max_latency_ms:
                 continue
-            
-            # Check safety tier
-            if model.safety_tier.value < policy.required_safety_tier.value:
+            if safety_rank < required_rank:
                 continue
-            
-            # Estimate cost
-            estimated_tokens = len(request.prompt.split()) * 1.3  # Rough estimate
-            estimated_cost = (estimated_tokens / 1000) * model.cost_per_1k_tokens
-            
-            if estimated_cost > policy.max_cost_usd:
+            if (estimated_tokens / 1000) * model.cost_per_1k_tokens > policy.max_cost_usd:
                 continue
             
-            candidates.append((name, model, estimated_cost))
-        
-        if not candidates:
-            if policy.allow_fallback:
-                # Fallback to cheapest available model
-                candidates = [(name, model, 0) for name, model in self.models.items() 
-                             if self.health_status.get(name, True)]
-                candidates.sort(key=lambda x: x[1].cost_per_1k_tokens)
-            else:
-                return None
-        
-        # Sort by preference
-        if policy.preferred_tier:
-            candidates.sort(key=lambda x: (
-                0 if x[1].tier == policy.preferred_tier else 1,
-                x[2]  # cost
-            ))
-        else:
-            # Sort by cost
-            candidates.sort(key=lambda x: x[2])
+            if preferred_tier is None or model.tier is preferred_tier:
+                return name
+            if best is None:
+                best = name
         
-        selected_model = candidates[0][0]
-        self.routing_cache[cache_key] = selected_model
-        return selected_model
+        if best is not None:
+            return best
+        if policy.allow_fallback:
+            return fallback_preferred or fallback
+        return None
     
-    async def infer(self, request: ModelRequest, policy: Optional[RoutingPolicy] = None) -> ModelResponse:
-        """Perform model inference with routing"""
+    def _success_rate(self, endpoint: str) -> float:
+        successes, total = self._endpoint_outcomes.get(endpoint, (0, 0))
+        return successes / total if total else 1.0
+    
+    def _record_outcome(self, endpoint: str, success: bool):
+        successes, total = self._endpoint_outcomes.get(endpoint, (0, 0))
+        self._endpoint_outcomes[endpoint] = (successes + success, total + 1)
+    
+    def select_replica(self, model: ModelProfile, prompt: str) -> str:
+        """Pick the replica for a request, preferring one with a warm prefix cache"""
+        endpoints = model.endpoints
+        if len(endpoints) == 1:
+            return endpoints[0]
+        
+        now = time.monotonic()
+        pfx = _prefix_hash(prompt)
+        loads = [self._running_requests.get(ep, 0) for ep in endpoints]
+        
+        # Honour the cached replica only while its load is within min + 1 stddev
+        cached_endpoint = None
+        entry = self._prefix_index.get(pfx)
+        if entry and entry[1] > now and entry[0] in endpoints:
+            mean = sum(loads) / len(loads)
+            stddev = math.sqrt(sum((load - mean) ** 2 for load in loads) / len(loads))
+            if self._running_requests.get(entry[0], 0) <= min(loads) + stddev:
+                cached_endpoint = entry[0]
+        
+        max_load = max(loads) or 1
+        
+        def score(item: tuple[str, int]) -> float:
+            endpoint, load = item
+            return (
+                (50.0 if endpoint == cached_endpoint else 0.0)
+                + 25.0 * self._success_rate(endpoint)
+                + 15.0 * (1.0 - load / max_load)
+            )
+        
+        selected = max(zip(endpoints, loads), key=score)[0]
+        
+        if pfx not in self._prefix_index and len(self._prefix_index) >= PREFIX_INDEX_MAX_ENTRIES:
+            self._prefix_index = {k: v for k, v in self._prefix_index.items() if v[1] > now}
+            if len(self._prefix_index) >= PREFIX_INDEX_MAX_ENTRIES:
+                self._prefix_index.pop(next(iter(self._prefix_index)))
+        self._prefix_index[pfx] = (selected, now + PREFIX_INDEX_TTL_SECS)
+        return selected
+    
+    def _route(self, request: ModelRequest, policy: Optional[RoutingPolicy]) -> tuple[str, ModelProfile, str]:
+        """Resolve the model and replica endpoint for a request"""
         if policy is None:
             policy = RoutingPolicy()
         
@@ -234,7 +456,33 @@ class ModelGateway:
             raise ValueError("No suitable model found for the given policy")
         
         model = self.models[model_name]
-        
+        return model_name, model, self.select_replica(model, request.prompt)
+    
+    @staticmethod
+    def _api_body(request: ModelRequest, model: ModelProfile, stream: bool) -> bytes:
+        """Serialize the upstream completion payload from a fixed template"""
+        return _BODY_TEMPLATE % (
+            _dumps_str(request.prompt),
+            request.max_tokens or model.max_tokens,
+            repr(float(request.temperature)).encode(),
+            repr(float(request.top_p)).encode(),
+            b"true" if stream else b"false"
+        )
+    
+    async def infer(self, request: ModelRequest, policy: Optional[RoutingPolicy] = None) -> ModelResponse:
+        """Perform model inference with routing"""
+        model_name, model, endpoint = self._route(request, policy)
+        return await self._infer_nonstream(request, model_name, model, endpoint)
+    
+    def infer_stream(self, request: ModelRequest, policy: Optional[RoutingPolicy] = None) -> AsyncIterator[str]:
+        """Route eagerly, then return an iterator over upstream SSE events"""
+        model_name, model, endpoint = self._route(request, policy)
+        return self._infer_stream(request, model_name, model, endpoint)
+    
+    async def _infer_nonstream(
+        self, request: ModelRequest, model_name: str, model: ModelProfile, endpoint: str
+    ) -> ModelResponse:
+        """Buffered inference against a resolved endpoint"""
         # Prepare request
         start_time = time.time()
         
@@ -242,38 +490,23 @@ class ModelGateway:
         tokens_used = len(request.prompt.split()) * 1.3
         cost_usd = (tokens_used / 1000) * model.cost_per_1k_tokens
         
-        # Prepare API request
-        api_request = {
-            "prompt": request.prompt,
-            "max_tokens": request.max_tokens or model.max_tokens,
-            "temperature": request.temperature,
-            "top_p": request.top_p,
-            "stream": request.stream and model.supports_streaming
-        }
-        
-        headers = {"Content-Type": "application/json"}
-        if model.api_key:
-            headers["Authorization"] = f"Bearer {model.api_key}"
+        body = self._api_body(request, model, stream=False)
         
+        self._running_requests[endpoint] = self._running_requests.get(endpoint, 0) + 1
         try:
             # Make API call
             response = await self._client.post(
-                model.endpoint,
-                json=api_request,
-                headers=headers
+                model._urls[endpoint],
+                content=body,
+                headers=model._headers
             )
             response.raise_for_status()
             
             # Parse response
             data = response.json()
             
-            # Extract text (format varies by provider)
-            if "choices" in data:
-                text = data["choices"][0]["text"]
-            elif "content" in data:
-                text = data["content"]
-            else:
-                text = str(data)
+            # Extract text with the provider-specific extractor
+            text = model._extract(data)
             
             latency_ms = (time.time() - start_time) * 1000
             
@@ -286,6 +519,7 @@ class ModelGateway:
                 if safety_score < 0.7:
                     warnings.append("Low safety score detected")
             
+            self._record_outcome(endpoint, True)
             return ModelResponse(
                 text=text,
                 model_used=model_name,
@@ -297,8 +531,44 @@ class ModelGateway:
             )
             
         except Exception as e:
+            self._record_outcome(endpoint, False)
             logger.error(f"Model inference failed for {model_name}: {e}")
             raise
+        finally:
+            self._running_requests[endpoint] -= 1
+    
+    async def _infer_stream(
+        self, request: ModelRequest, model_name: str, model: ModelProfile, endpoint: str
+    ) -> AsyncIterator[str]:
+        """Relay upstream SSE lines as they arrive"""
+        # Models without streaming support are answered as a single event
+        if not model.supports_streaming:
+            response = await self._infer_nonstream(request, model_name, model, endpoint)
+            yield f"data: {response.model_dump_json()}\n\n"
+            return
+        
+        # Safety scoring is skipped: the text is never buffered in full
+        body = self._api_body(request, model, stream=True)
+        
+        self._running_requests[endpoint] = self._running_requests.get(endpoint, 0) + 1
+        try:
+            async with self._client.stream(
+                "POST",
+                model._urls[endpoint],
+                content=body,
+                headers=model._headers
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line:
+                        yield f"{line}\n\n"
+            self._record_outcome(endpoint, True)
+        except Exception as e:
+            self._record_outcome(endpoint, False)
+            logger.error(f"Streaming inference failed for {model_name}: {e}")
+            raise
+        finally:
+            self._running_requests[endpoint] -= 1
     
     def _calculate_safety_score(self, text: str) -> float:
         """Calculate safety score for generated text (placeholder implementation)"""
@@ -329,44 +599,42 @@ class ModelGateway:
     
     async def get_model_stats(self) -> Dict[str, Any]:
         """Get statistics about available models"""
-        stats = {
+        return {
             "total_models": len(self.models),
             "healthy_models": sum(1 for healthy in self.health_status.values() if healthy),
-            "models_by_tier": {},
-            "models_by_safety": {},
-            "total_cost_per_1k": sum(model.cost_per_1k_tokens for model in self.models.values())
+            "models_by_tier": {tier: n for tier, n in self._tier_counts.items() if n},
+            "models_by_safety": {safety: n for safety, n in self._safety_counts.items() if n},
+            "total_cost_per_1k": self._total_cost
         }
-        
-        # Group by tier
-        for model in self.models.values():
-            tier = model.tier.value
-            if tier not in stats["models_by_tier"]:
-                stats["models_by_tier"][tier] = 0
-            stats["models_by_tier"][tier] += 1
-        
-        # Group by safety tier
-        for model in self.models.values():
-            safety = model.safety_tier.value
-            if safety not in stats["models_by_safety"]:
-                stats["models_by_safety"][safety] = 0
-            stats["models_by_safety"][safety] += 1
-        
-        return stats
     
     async def close(self):
         """Close the HTTP client"""
         await self._client.aclose()
 
 
-# Global instance
-model_gateway = ModelGateway()
+# Global instance, built per worker process in the app lifespan
+model_gateway: Optional[ModelGateway] = None
 
 
 # FastAPI integration
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+
 
-app = FastAPI(title="Model Gateway")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Give each worker its own HTTP client and routing caches"""
+    global model_gateway
+    model_gateway = ModelGateway()
+    try:
+        yield
+    finally:
+        await model_gateway.close()
+
+
+app = FastAPI(title="Model Gateway", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -380,11 +648,15 @@ app.add_middleware(
 @app.post("/infer")
 async def infer_endpoint(
     request: ModelRequest,
-    policy: Optional[RoutingPolicy] = None,
-    background_tasks: BackgroundTasks = None
+    policy: Optional[RoutingPolicy] = None
 ):
     """Model inference endpoint"""
     try:
+        if request.stream:
+            return StreamingResponse(
+                model_gateway.infer_stream(request, policy),
+                media_type="text/event-stream"
+            )
         response = await model_gateway.infer(request, policy)
         return response
     except Exception as e:
@@ -395,7 +667,10 @@ async def infer_endpoint(
 async def list_models():
     """List available models"""
     return {
-        "models": {name: asdict(model) for name, model in model_gateway.models.items()},
+        "models": {
+            name: {f.name: getattr(model, f.name) for f in fields(model) if f.init}
+            for name, model in model_gateway.models.items()
+        },
         "health_status": model_gateway.health_status
     }
 
@@ -415,6 +690,12 @@ async def warm_model(model_name: str):
     return {"status": "warmed"}
 
 
+@app.post("/health/sweep")
+async def health_sweep():
+    """Probe all model endpoints concurrently"""
+    return await model_gateway.health_check_all()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -422,5 +703,13 @@ async def health_check():
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8087)
\ No newline at end of file
+    uvicorn.run(
+        "model_gateway.app:app",
+        host="0.0.0.0",
+        port=8087,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("GATEWAY_WORKERS", "4"))
+    )
\ No newline at end of file
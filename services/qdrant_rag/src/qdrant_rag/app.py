@@ -7,23 +7,120 @@ High-performance vector database service for RAG capabilities with multimodal su
 from __future__ import annotations
 import asyncio
 import json
+import os
+import re
 import time
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+import zlib
+from collections import Counter, OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Union
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import httpx
-from qdrant_client import QdrantClient
+import numpy as np
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.models import (
     Distance, VectorParams, PointStruct, Filter, FieldCondition, 
-    MatchValue, SearchRequest, FilterSelector
+    MatchValue, MatchAny, SearchRequest, FilterSelector, SparseVectorParams, SparseVector,
+    Modifier, PayloadSchemaType, Prefetch, FusionQuery, Fusion, ScoredPoint,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, HnswConfigDiff,
+    SearchParams, QuantizationSearchParams
 )
 from sentence_transformers import SentenceTransformer
+import torch
 import logging
-import hashlib
 import uuid
 
 logger = logging.getLogger(__name__)
 
+TEXT_ENCODER_MODEL = "all-MiniLM-L6-v2"
+MULTIMODAL_ENCODER_MODEL = "clip-ViT-B-32"
+
+# "quantized" runs the text encoder as ONNX Runtime INT8 on CPU (FP16 on GPU)
+# and CLIP in FP16 on GPU; "fp32" keeps the reference PyTorch models for A/B checks
+ENCODER_PRECISION = os.getenv("RAG_ENCODER_PRECISION", "quantized")
+ONNX_INT8_MODEL_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Sparse keyword vectors: BM25 term-frequency weights are computed here and
+# Qdrant applies IDF server-side via the sparse vector modifier
+SPARSE_VECTOR_NAME = "bm25"
+SPARSE_VECTOR_PARAMS = SparseVectorParams(modifier=Modifier.IDF)
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_AVG_DOC_TOKENS = 256
+HYBRID_PREFETCH_LIMIT = 40
+
+# INT8 vectors are searched with oversampling and rescored against the originals
+QUANTIZED_SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
+# Optional INT8 dot-product rerank of fused hybrid candidates against the query,
+# backed by an in-process shadow of recently seen document vectors
+HYBRID_RERANK = os.getenv("RAG_HYBRID_RERANK", "0") == "1"
+HOT_VECTOR_CAPACITY = 100_000
+
+# Cached vector-search results expire after this many seconds, bounding how long
+# writes from other processes go unseen (0 disables the cache)
+QUERY_CACHE_TTL_S = float(os.getenv("RAG_QUERY_CACHE_TTL", "30"))
+
+# Payload fields indexed for filtered search
+FILTER_INDEX_FIELDS = ("tenant_id", "document_type", "collection_name")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _token_counts(text: str) -> Counter:
+    """Term counts keyed by a 32-bit token hash"""
+    return Counter(zlib.crc32(token.encode()) for token in _TOKEN_RE.findall(text.lower()))
+
+
+def _bm25_document_vector(text: str) -> SparseVector:
+    """Sparse BM25 term-frequency vector for a document"""
+    counts = _token_counts(text)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * sum(counts.values()) / BM25_AVG_DOC_TOKENS)
+    return SparseVector(
+        indices=list(counts),
+        values=[tf * (BM25_K1 + 1) / (tf + norm) for tf in counts.values()]
+    )
+
+
+def _bm25_query_vector(text: str) -> SparseVector:
+    """Sparse query vector with unit weight per distinct term"""
+    indices = list(_token_counts(text))
+    return SparseVector(indices=indices, values=[1.0] * len(indices))
+
+
+def _load_text_encoder(device: str) -> SentenceTransformer:
+    """Load the text encoder at the configured precision"""
+    if ENCODER_PRECISION == "fp32":
+        return SentenceTransformer(TEXT_ENCODER_MODEL, device=device)
+    
+    if device == "cuda":
+        return SentenceTransformer(
+            TEXT_ENCODER_MODEL,
+            device=device,
+            model_kwargs={"torch_dtype": torch.float16}
+        )
+    
+    try:
+        return SentenceTransformer(
+            TEXT_ENCODER_MODEL,
+            backend="onnx",
+            model_kwargs={"file_name": ONNX_INT8_MODEL_FILE, "provider": "CPUExecutionProvider"}
+        )
+    except Exception as e:
+        logger.warning(f"INT8 ONNX text encoder unavailable, using FP32: {e}")
+        return SentenceTransformer(TEXT_ENCODER_MODEL, device=device)
+
+
+def _load_multimodal_encoder(device: str) -> SentenceTransformer:
+    """Load the CLIP encoder, in FP16 when running on GPU"""
+    encoder = SentenceTransformer(MULTIMODAL_ENCODER_MODEL, device=device)
+    if ENCODER_PRECISION != "fp32" and device == "cuda":
+        encoder.half()
+    return encoder
+
 
 class DocumentType(Enum):
     """Supported document types"""
@@ -38,6 +135,34 @@ class DocumentType(Enum):
     CSV = "csv"
 
 
+_DOC_TYPE_CACHE = {member.value: member for member in DocumentType}
+
+# Point payload field names
+_P_CONTENT = "content"
+_P_META = "metadata"
+_P_TYPE = "document_type"
+_P_TENANT = "tenant_id"
+_P_COLL = "collection_name"
+_P_CA = "created_at"
+_P_UA = "updated_at"
+
+
+def _build_payload(content: str, metadata: Dict[str, Any], document_type: DocumentType,
+                   tenant_id: str, collection_name: str,
+                   created_at: Optional[str] = None) -> Dict[str, Any]:
+    """Point payload shared by every ingest path"""
+    now = str(time.time())
+    return {
+        _P_CONTENT: content,
+        _P_META: metadata,
+        _P_TYPE: document_type.value,
+        _P_TENANT: tenant_id,
+        _P_COLL: collection_name,
+        _P_CA: created_at or now,
+        _P_UA: now
+    }
+
+
 class SearchType(Enum):
     """Search types"""
     VECTOR = "vector"
@@ -52,7 +177,7 @@ class Document:
     id: str
     content: str
     metadata: Dict[str, Any]
-    embeddings: Optional[List[float]] = None
+    embeddings: Optional[np.ndarray] = None  # float32
     document_type: DocumentType = DocumentType.TEXT
     tenant_id: str = ""
     collection_name: str = ""
@@ -79,29 +204,347 @@ class CollectionConfig:
     shard_number: int = 1
     replication_factor: int = 1
     on_disk_payload: bool = True
+    indexed_metadata_fields: List[str] = field(default_factory=list)  # Metadata keys used in filters
+    quantize_int8: bool = True  # INT8 scalar-quantized copy of vectors kept in RAM
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent encode requests into batched encoder calls"""
+    
+    def __init__(self, encoder: SentenceTransformer, executor: Optional[Executor] = None,
+                 max_batch: int = 64, max_wait_ms: float = 5.0):
+        self.encoder = encoder
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """Encode a single text as part of the next batch"""
+        if self._worker is None:
+            # Started lazily so the batcher binds to the serving event loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Drain up to max_batch items, waiting at most max_wait after the first
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Length-sorted batches minimize padding waste
+            batch.sort(key=lambda item: len(item[0]))
+            texts = [text for text, _ in batch]
+            
+            try:
+                embeddings = await loop.run_in_executor(self.executor, self._encode, texts)
+            except Exception as e:
+                logger.error(f"Batch encode of {len(texts)} texts failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            # One contiguous float32 buffer; rows are views handed to each caller
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode a batch, copying GPU output to host exactly once"""
+        if self.encoder.device.type == "cuda":
+            embeddings = self.encoder.encode(
+                texts,
+                batch_size=self.max_batch,
+                convert_to_tensor=True,
+                normalize_embeddings=True
+            )
+            return embeddings.half().cpu().numpy()
+        
+        return self.encoder.encode(
+            texts,
+            batch_size=self.max_batch,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+    
+    async def close(self):
+        """Stop the batching worker"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+
+class PointBuffer:
+    """Coalesces point upserts per collection into batched writes"""
+    
+    def __init__(self, write: Callable[[str, List[PointStruct]], Awaitable[None]],
+                 max_batch: int = 128, flush_interval_ms: float = 10.0):
+        self._write = write
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self._pending: Dict[str, List[tuple[PointStruct, asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+    
+    async def put(self, collection_id: str, point: PointStruct):
+        """Queue a point and wait until the batch holding it is written"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(collection_id, [])
+        pending.append((point, future))
+        
+        if len(pending) >= self.max_batch:
+            self._flush(collection_id)
+        elif len(pending) == 1:
+            self._timers[collection_id] = loop.call_later(self.flush_interval, self._flush, collection_id)
+        
+        await future
+    
+    def _flush(self, collection_id: str):
+        timer = self._timers.pop(collection_id, None)
+        if timer is not None:
+            timer.cancel()
+        
+        items = self._pending.pop(collection_id, None)
+        if items:
+            task = asyncio.create_task(self._write_batch(collection_id, items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _write_batch(self, collection_id: str, items: List[tuple[PointStruct, asyncio.Future]]):
+        try:
+            await self._write(collection_id, [point for point, _ in items])
+        except Exception as e:
+            logger.error(f"Batch upsert of {len(items)} points into {collection_id} failed: {e}")
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, future in items:
+                if not future.done():
+                    future.set_result(None)
+    
+    async def close(self):
+        """Write out everything still pending"""
+        for collection_id in list(self._pending):
+            self._flush(collection_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class _QueryRing:
+    """Fixed-capacity ring of query embeddings and their results"""
+    
+    __slots__ = ("vectors", "expires", "results", "size", "next")
+    
+    def __init__(self, dim: int):
+        self.vectors = np.empty((16, dim), dtype=np.float32)
+        self.expires = np.empty(16, dtype=np.float64)
+        self.results: List[List[SearchResult]] = []
+        self.size = 0
+        self.next = 0
+
+
+class SemanticQueryCache:
+    """Recent query embeddings mapped to their results by cosine similarity
+    
+    Entries are partitioned by scope (collection, limit, threshold, filters) so a
+    hit is only served for an equivalent search. Embeddings are L2-normalized,
+    so cosine similarity is a single matrix-vector product per lookup. Entries
+    expire after ``ttl`` seconds; a per-collection generation, bumped by
+    ``invalidate``, keeps searches that raced a write from being cached.
+    """
+    
+    def __init__(self, capacity: int = 1024, threshold: float = 0.95, max_scopes: int = 256,
+                 ttl: float = QUERY_CACHE_TTL_S):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.max_scopes = max_scopes
+        self.ttl = ttl
+        self._scopes: OrderedDict[tuple, _QueryRing] = OrderedDict()
+        self._generations: Dict[str, int] = {}
+    
+    @staticmethod
+    def scope(collection_id: str, limit: int, score_threshold: float,
+              filters: Optional[Dict]) -> tuple:
+        filters_key = json.dumps(filters, sort_keys=True, default=str) if filters else None
+        return (collection_id, limit, score_threshold, filters_key)
+    
+    def generation(self, collection_id: str) -> int:
+        """Current write generation; pass it back to ``insert``"""
+        return self._generations.get(collection_id, 0)
+    
+    def lookup(self, scope: tuple, vector: np.ndarray) -> Optional[List[SearchResult]]:
+        """Return cached results for a near-duplicate query, if any"""
+        ring = self._scopes.get(scope)
+        if ring is None or ring.size == 0:
+            return None
+        
+        self._scopes.move_to_end(scope)
+        similarities = np.where(
+            ring.expires[:ring.size] > time.monotonic(),
+            ring.vectors[:ring.size] @ vector,
+            -np.inf
+        )
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return ring.results[best]
+        return None
+    
+    def insert(self, scope: tuple, vector: np.ndarray, results: List[SearchResult], generation: int):
+        """Remember results for a query, evicting the oldest entry when full"""
+        if self.ttl <= 0 or generation != self.generation(scope[0]):
+            return
+        expires_at = time.monotonic() + self.ttl
+        ring = self._scopes.get(scope)
+        if ring is None:
+            if len(self._scopes) >= self.max_scopes:
+                self._scopes.popitem(last=False)
+            ring = self._scopes[scope] = _QueryRing(vector.shape[0])
+        self._scopes.move_to_end(scope)
+        
+        if ring.size < self.capacity:
+            if ring.size == len(ring.vectors):
+                rows = min(self.capacity, 2 * ring.size)
+                grown = np.empty((rows, ring.vectors.shape[1]), dtype=np.float32)
+                grown[:ring.size] = ring.vectors
+                ring.vectors = grown
+                ring.expires = np.resize(ring.expires, rows)
+            ring.vectors[ring.size] = vector
+            ring.expires[ring.size] = expires_at
+            ring.results.append(results)
+            ring.size += 1
+        else:
+            ring.vectors[ring.next] = vector
+            ring.expires[ring.next] = expires_at
+            ring.results[ring.next] = results
+            ring.next = (ring.next + 1) % self.capacity
+    
+    def invalidate(self, collection_id: str):
+        """Drop cached results for a collection whose contents changed"""
+        self._generations[collection_id] = self.generation(collection_id) + 1
+        for scope in [scope for scope in self._scopes if scope[0] == collection_id]:
+            del self._scopes[scope]
+
+
+class HotVectorCache:
+    """LRU shadow of document vectors quantized to INT8 for client-side reranking
+    
+    Each row is quantized symmetrically with its own scale, so scoring a
+    candidate set against the query is one integer matrix-vector product.
+    """
+    
+    def __init__(self, capacity: int = HOT_VECTOR_CAPACITY):
+        self.capacity = capacity
+        self._rows: OrderedDict[tuple, tuple[np.ndarray, float]] = OrderedDict()
+    
+    @staticmethod
+    def quantize(vector) -> tuple[np.ndarray, float]:
+        vector = np.asarray(vector, dtype=np.float32)
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        return np.round(vector / scale).astype(np.int8), scale
+    
+    def missing(self, collection_id: str, point_ids: List[Any]) -> List[Any]:
+        """Point ids that have no cached vector yet"""
+        return [point_id for point_id in point_ids if (collection_id, point_id) not in self._rows]
+    
+    def put(self, collection_id: str, point_id: Any, vector):
+        key = (collection_id, point_id)
+        self._rows[key] = self.quantize(vector)
+        self._rows.move_to_end(key)
+        while len(self._rows) > self.capacity:
+            self._rows.popitem(last=False)
+    
+    def scores(self, collection_id: str, point_ids: List[Any], query: np.ndarray) -> np.ndarray:
+        """Approximate dot products of the query with each cached point vector"""
+        query_int8, query_scale = self.quantize(query)
+        matrix = np.empty((len(point_ids), query_int8.shape[0]), dtype=np.int8)
+        scales = np.empty(len(point_ids), dtype=np.float32)
+        for row, point_id in enumerate(point_ids):
+            key = (collection_id, point_id)
+            matrix[row], scales[row] = self._rows[key]
+            self._rows.move_to_end(key)
+        return (matrix.astype(np.int32) @ query_int8.astype(np.int32)) * (query_scale * scales)
+    
+    def invalidate(self, collection_id: str, point_ids: List[Any]):
+        """Drop cached vectors for points that were rewritten or deleted"""
+        for point_id in point_ids:
+            self._rows.pop((collection_id, point_id), None)
 
 
 class QdrantRAGService:
     """Qdrant-based RAG service with multimodal support"""
     
-    def __init__(self, qdrant_host: str = "localhost", qdrant_port: int = 6333):
+    def __init__(self, qdrant_host: str = "localhost", qdrant_port: int = 6333,
+                 qdrant_grpc_port: int = 6334):
         self.qdrant_host = qdrant_host
         self.qdrant_port = qdrant_port
-        self.client = QdrantClient(host=qdrant_host, port=qdrant_port)
+        self.client = AsyncQdrantClient(
+            host=qdrant_host,
+            port=qdrant_port,
+            grpc_port=qdrant_grpc_port,
+            prefer_grpc=True
+        )
         
         # Embedding models
-        self.text_encoder = SentenceTransformer('all-MiniLM-L6-v2')
-        self.multimodal_encoder = SentenceTransformer('clip-ViT-B-32')
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.text_encoder = _load_text_encoder(self.device)
+        self.multimodal_encoder = _load_multimodal_encoder(self.device)
+        
+        # Encoders are blocking PyTorch/ONNX calls; a single dedicated thread
+        # keeps them off the event loop without contending for the device
+        self._encode_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="encode")
+        self.text_batcher = EmbeddingBatcher(self.text_encoder, self._encode_pool)
+        self.multimodal_batcher = EmbeddingBatcher(self.multimodal_encoder, self._encode_pool)
         
         # Collection cache
         self.collections: Dict[str, CollectionConfig] = {}
         
-        # Initialize default collections
-        asyncio.create_task(self._initialize_collections())
+        # Whether each collection has the BM25 sparse vector; collections created
+        # before it was introduced (or by other services) are upgraded or served dense-only
+        self._sparse_enabled: Dict[str, bool] = {}
+        
+        # Near-duplicate vector queries are answered from recent results
+        self.query_cache = SemanticQueryCache()
+        
+        # INT8 vectors of recent hybrid candidates for optional reranking
+        self.hot_vectors = HotVectorCache()
+        
+        # Ingest writes are coalesced into per-collection batches
+        self.point_buffer = PointBuffer(self._upsert_points)
+
     
     async def _initialize_collections(self):
         """Initialize default collections"""
         try:
+            # Seed the collection cache once so steady-state creates skip Qdrant
+            for collection in (await self.client.get_collections()).collections:
+                tenant_id, _, collection_name = collection.name.partition("_")
+                self.collections.setdefault(
+                    collection.name,
+                    CollectionConfig(name=collection_name, tenant_id=tenant_id)
+                )
+            
             # Create default tenant collections
             await self.create_collection("default", "documents")
             await self.create_collection("default", "multimodal")
@@ -114,6 +557,9 @@ class QdrantRAGService:
         """Create a new collection for tenant"""
         collection_id = f"{tenant_id}_{collection_name}"
         
+        if collection_id in self.collections:
+            return collection_id
+        
         if config is None:
             config = CollectionConfig(
                 name=collection_name,
@@ -123,80 +569,143 @@ class QdrantRAGService:
             )
         
         try:
-            # Check if collection exists
-            collections = self.client.get_collections()
-            existing_names = [col.name for col in collections.collections]
+            await self.client.create_collection(
+                collection_name=collection_id,
+                vectors_config=VectorParams(
+                    size=config.vector_size,
+                    distance=config.distance_metric
+                ),
+                sparse_vectors_config={
+                    SPARSE_VECTOR_NAME: SPARSE_VECTOR_PARAMS
+                },
+                quantization_config=ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(
+                        type=ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True
+                    )
+                ) if config.quantize_int8 else None,
+                hnsw_config=HnswConfigDiff(on_disk=True) if config.quantize_int8 else None,
+                shard_number=config.shard_number,
+                replication_factor=config.replication_factor,
+                on_disk_payload=config.on_disk_payload
+            )
+            await self.client.create_payload_index(
+                collection_id,
+                field_name=_P_CONTENT,
+                field_schema=PayloadSchemaType.TEXT
+            )
             
-            if collection_id not in existing_names:
-                self.client.create_collection(
-                    collection_name=collection_id,
-                    vectors_config=VectorParams(
-                        size=config.vector_size,
-                        distance=config.distance_metric
-                    ),
-                    shard_number=config.shard_number,
-                    replication_factor=config.replication_factor,
-                    on_disk_payload=config.on_disk_payload
+            # Keyword indexes keep filtered ANN searches off the full payload scan
+            filter_fields = [*FILTER_INDEX_FIELDS, *(f"metadata.{key}" for key in config.indexed_metadata_fields)]
+            for field_name in filter_fields:
+                await self.client.create_payload_index(
+                    collection_id,
+                    field_name=field_name,
+                    field_schema=PayloadSchemaType.KEYWORD
                 )
-                
-                logger.info(f"Created collection: {collection_id}")
             
-            self.collections[collection_id] = config
-            return collection_id
+            self._sparse_enabled[collection_id] = True
+            logger.info(f"Created collection: {collection_id}")
             
         except Exception as e:
-            logger.error(f"Failed to create collection {collection_id}: {e}")
-            raise
+            # Created elsewhere since the cache was seeded; adopt it
+            if "already exists" not in str(e).lower():
+                logger.error(f"Failed to create collection {collection_id}: {e}")
+                raise
+        
+        self.collections[collection_id] = config
+        return collection_id
     
-    async def ingest_document(self, document: Document) -> Document:
-        """Ingest document with embeddings"""
-        collection_id = f"{document.tenant_id}_{document.collection_name}"
+    async def _has_sparse(self, collection_id: str) -> bool:
+        """Check once per collection for the BM25 sparse vector, adding it if missing"""
+        enabled = self._sparse_enabled.get(collection_id)
+        if enabled is not None:
+            return enabled
+        
+        try:
+            info = await self.client.get_collection(collection_id)
+            enabled = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+            if not enabled:
+                await self.client.update_collection(
+                    collection_name=collection_id,
+                    sparse_vectors_config={SPARSE_VECTOR_NAME: SPARSE_VECTOR_PARAMS}
+                )
+                info = await self.client.get_collection(collection_id)
+                enabled = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+        except Exception as e:
+            logger.warning(f"Could not add sparse vector to {collection_id}: {e}")
+            enabled = False
+        
+        if not enabled:
+            logger.warning(f"Collection {collection_id} has no {SPARSE_VECTOR_NAME} vector; using dense-only search")
+        self._sparse_enabled[collection_id] = enabled
+        return enabled
+    
+    async def _upsert_points(self, collection_id: str, points: List[PointStruct], wait: bool = False):
+        """Write a batch of points and invalidate cached queries on the collection"""
+        await self.client.upsert(
+            collection_name=collection_id,
+            points=points,
+            wait=wait
+        )
+        self.query_cache.invalidate(collection_id)
+        self.hot_vectors.invalidate(collection_id, [point.id for point in points])
+    
+    async def ingest_document(self, document: Document, flush: bool = False) -> Document:
+        """Ingest document with embeddings
+        
+        Points are written in batches without waiting for indexing; pass
+        ``flush=True`` to write immediately and wait until searchable.
+        """
+        payload = _build_payload(
+            document.content, document.metadata, document.document_type,
+            document.tenant_id, document.collection_name, document.created_at
+        )
+        
+        document.embeddings = await self.ingest_payload(document.id, payload, document.document_type, flush)
+        return document
+    
+    async def ingest_payload(self, point_id: str, payload: Dict[str, Any],
+                             document_type: DocumentType, flush: bool = False) -> np.ndarray:
+        """Embed and store a prepared point payload, returning its embedding"""
+        tenant_id = payload[_P_TENANT]
+        collection_name = payload[_P_COLL]
+        collection_id = f"{tenant_id}_{collection_name}"
         
         if collection_id not in self.collections:
-            await self.create_collection(document.tenant_id, document.collection_name)
+            await self.create_collection(tenant_id, collection_name)
         
         try:
             # Generate embeddings based on document type
-            if document.document_type in [DocumentType.TEXT, DocumentType.MARKDOWN, DocumentType.CODE]:
-                embeddings = self.text_encoder.encode(document.content).tolist()
-            elif document.document_type in [DocumentType.IMAGE]:
+            content = payload[_P_CONTENT]
+            if document_type in [DocumentType.TEXT, DocumentType.MARKDOWN, DocumentType.CODE]:
+                embeddings = await self.text_batcher.embed(content)
+            elif document_type in [DocumentType.IMAGE]:
                 # For images, we'd need to process the image first
                 # This is a placeholder - would integrate with image processing
-                embeddings = self.multimodal_encoder.encode([document.content]).tolist()[0]
+                embeddings = await self.multimodal_batcher.embed(content)
             else:
-                embeddings = self.text_encoder.encode(document.content).tolist()
-            
-            document.embeddings = embeddings
-            
-            # Prepare metadata
-            payload = {
-                "content": document.content,
-                "metadata": document.metadata,
-                "document_type": document.document_type.value,
-                "tenant_id": document.tenant_id,
-                "collection_name": document.collection_name,
-                "created_at": document.created_at or str(time.time()),
-                "updated_at": str(time.time())
-            }
+                embeddings = await self.text_batcher.embed(content)
             
             # Create point
-            point = PointStruct(
-                id=document.id,
-                vector=embeddings,
-                payload=payload
-            )
+            if await self._has_sparse(collection_id):
+                vector = {"": embeddings, SPARSE_VECTOR_NAME: _bm25_document_vector(content)}
+            else:
+                vector = embeddings
+            point = PointStruct(id=point_id, vector=vector, payload=payload)
             
             # Upsert to Qdrant
-            self.client.upsert(
-                collection_name=collection_id,
-                points=[point]
-            )
+            if flush:
+                await self._upsert_points(collection_id, [point], wait=True)
+            else:
+                await self.point_buffer.put(collection_id, point)
             
-            logger.info(f"Ingested document {document.id} into {collection_id}")
-            return document
+            logger.info(f"Ingested document {point_id} into {collection_id}")
+            return embeddings
             
         except Exception as e:
-            logger.error(f"Failed to ingest document {document.id}: {e}")
+            logger.error(f"Failed to ingest document {point_id}: {e}")
             raise
     
     async def search(self, tenant_id: str, collection_name: str, query: str,
@@ -211,7 +720,19 @@ class QdrantRAGService:
         
         try:
             if search_type == SearchType.VECTOR:
-                return await self._vector_search(collection_id, query, limit, filters, score_threshold)
+                query_embeddings = await self.text_batcher.embed(query)
+                scope = self.query_cache.scope(collection_id, limit, score_threshold, filters)
+                generation = self.query_cache.generation(collection_id)
+                cached = self.query_cache.lookup(scope, query_embeddings)
+                if cached is not None:
+                    return cached
+                
+                results = await self._vector_search(
+                    collection_id, query, limit, filters, score_threshold,
+                    query_embeddings=query_embeddings
+                )
+                self.query_cache.insert(scope, query_embeddings, results, generation)
+                return results
             elif search_type == SearchType.KEYWORD:
                 return await self._keyword_search(collection_id, query, limit, filters)
             elif search_type == SearchType.HYBRID:
@@ -224,10 +745,12 @@ class QdrantRAGService:
             raise
     
     async def _vector_search(self, collection_id: str, query: str, limit: int,
-                           filters: Optional[Dict], score_threshold: float) -> List[SearchResult]:
+                           filters: Optional[Dict], score_threshold: float,
+                           query_embeddings: Optional[np.ndarray] = None) -> List[SearchResult]:
         """Vector similarity search"""
         # Generate query embeddings
-        query_embeddings = self.text_encoder.encode(query).tolist()
+        if query_embeddings is None:
+            query_embeddings = await self.text_batcher.embed(query)
         
         # Build filter
         qdrant_filter = None
@@ -235,84 +758,129 @@ class QdrantRAGService:
             qdrant_filter = self._build_qdrant_filter(filters)
         
         # Search in Qdrant
-        search_results = self.client.search(
+        search_results = await self.client.search(
             collection_name=collection_id,
             query_vector=query_embeddings,
             limit=limit,
             query_filter=qdrant_filter,
             score_threshold=score_threshold,
+            search_params=QUANTIZED_SEARCH_PARAMS,
             with_payload=True
         )
         
-        results = []
-        for result in search_results:
-            document = Document(
-                id=result.id,
-                content=result.payload["content"],
-                metadata=result.payload["metadata"],
-                document_type=DocumentType(result.payload["document_type"]),
-                tenant_id=result.payload["tenant_id"],
-                collection_name=result.payload["collection_name"],
-                created_at=result.payload.get("created_at"),
-                updated_at=result.payload.get("updated_at")
-            )
-            
-            results.append(SearchResult(
-                document=document,
-                score=result.score,
-                search_type=SearchType.VECTOR
-            ))
-        
-        return results
+        return self._to_search_results(search_results, SearchType.VECTOR)
     
     async def _keyword_search(self, collection_id: str, query: str, limit: int,
                             filters: Optional[Dict]) -> List[SearchResult]:
-        """Keyword search (placeholder - would integrate with Elasticsearch)"""
-        # This is a placeholder implementation
-        # In production, this would integrate with Elasticsearch or Postgres full-text search
-        logger.warning("Keyword search not implemented - using vector search fallback")
-        return await self._vector_search(collection_id, query, limit, filters, 0.0)
+        """Keyword search over the sparse BM25 vectors"""
+        if not await self._has_sparse(collection_id):
+            return await self._vector_search(collection_id, query, limit, filters, 0.0)
+        
+        sparse_query = _bm25_query_vector(query)
+        if not sparse_query.indices:
+            return []
+        
+        response = await self.client.query_points(
+            collection_name=collection_id,
+            query=sparse_query,
+            using=SPARSE_VECTOR_NAME,
+            query_filter=self._build_qdrant_filter(filters) if filters else None,
+            limit=limit,
+            with_payload=True
+        )
+        return self._to_search_results(response.points, SearchType.KEYWORD)
     
     async def _hybrid_search(self, collection_id: str, query: str, limit: int,
-                           filters: Optional[Dict], score_threshold: float,
-                           vector_weight: float = 0.7, keyword_weight: float = 0.3) -> List[SearchResult]:
-        """Hybrid vector + keyword search"""
-        # Get vector results
-        vector_results = await self._vector_search(collection_id, query, limit * 2, filters, score_threshold)
+                           filters: Optional[Dict], score_threshold: float) -> List[SearchResult]:
+        """Hybrid dense + BM25 search fused server-side with Reciprocal Rank Fusion"""
+        query_embeddings = await self.text_batcher.embed(query)
+        qdrant_filter = self._build_qdrant_filter(filters) if filters else None
+        prefetch_limit = max(HYBRID_PREFETCH_LIMIT, limit)
         
-        # Get keyword results (placeholder)
-        keyword_results = await self._keyword_search(collection_id, query, limit * 2, filters)
+        prefetch = [
+            Prefetch(
+                query=query_embeddings,
+                params=QUANTIZED_SEARCH_PARAMS,
+                filter=qdrant_filter,
+                score_threshold=score_threshold,
+                limit=prefetch_limit
+            )
+        ]
+        sparse_query = _bm25_query_vector(query)
+        if sparse_query.indices and await self._has_sparse(collection_id):
+            prefetch.append(Prefetch(
+                query=sparse_query,
+                using=SPARSE_VECTOR_NAME,
+                filter=qdrant_filter,
+                limit=prefetch_limit
+            ))
         
-        # Combine and rerank results
-        combined_results = self._combine_search_results(
-            vector_results, keyword_results, vector_weight, keyword_weight
+        response = await self.client.query_points(
+            collection_name=collection_id,
+            prefetch=prefetch,
+            query=FusionQuery(fusion=Fusion.RRF),
+            limit=prefetch_limit if HYBRID_RERANK else limit,
+            with_payload=True
         )
+        if HYBRID_RERANK and response.points:
+            return await self._rerank(collection_id, response.points, query_embeddings, limit)
+        return self._to_search_results(response.points, SearchType.HYBRID)
+    
+    async def _rerank(self, collection_id: str, points: List[ScoredPoint],
+                      query_embeddings: np.ndarray, limit: int) -> List[SearchResult]:
+        """Rerank fused candidates by INT8 dot product with the query embedding"""
+        point_ids = [point.id for point in points]
+        missing = self.hot_vectors.missing(collection_id, point_ids)
+        if missing:
+            records = await self.client.retrieve(
+                collection_name=collection_id,
+                ids=missing,
+                with_payload=False,
+                with_vectors=True
+            )
+            for record in records:
+                # collections without the sparse upgrade store a bare dense vector
+                vector = record.vector[""] if isinstance(record.vector, dict) else record.vector
+                self.hot_vectors.put(collection_id, record.id, vector)
         
-        return combined_results[:limit]
-    
-    def _combine_search_results(self, vector_results: List[SearchResult],
-                               keyword_results: List[SearchResult],
-                               vector_weight: float, keyword_weight: float) -> List[SearchResult]:
-        """Combine and rerank search results"""
-        combined = {}
-        
-        # Add vector results
-        for result in vector_results:
-            doc_id = result.document.id
-            combined[doc_id] = result
-            combined[doc_id].score *= vector_weight
-        
-        # Add keyword results
-        for result in keyword_results:
-            doc_id = result.document.id
-            if doc_id in combined:
-                combined[doc_id].score += result.score * keyword_weight
-            else:
-                combined[doc_id] = result
-                combined[doc_id].score *= keyword_weight
+        # Points deleted between fusion and retrieval are dropped
+        present = set(point_ids).difference(self.hot_vectors.missing(collection_id, point_ids))
+        candidates = [point for point in points if point.id in present]
+        scores = self.hot_vectors.scores(collection_id, [point.id for point in candidates], query_embeddings)
+        top = np.argsort(-scores, kind="stable")[:limit]
+        
+        results = self._to_search_results([candidates[i] for i in top], SearchType.HYBRID)
+        for result, i in zip(results, top):
+            result.score = float(scores[i])
+        return results
+    
+    @staticmethod
+    def _to_search_results(points: List[ScoredPoint], search_type: SearchType) -> List[SearchResult]:
+        """Convert scored Qdrant points into search results"""
+        doc_types = _DOC_TYPE_CACHE
+        results = []
+        append = results.append
+        for result in points:
+            payload = result.payload
+            get = payload.get
+            document = Document(
+                id=result.id,
+                content=payload[_P_CONTENT],
+                metadata=payload[_P_META],
+                document_type=doc_types[payload[_P_TYPE]],
+                tenant_id=payload[_P_TENANT],
+                collection_name=payload[_P_COLL],
+                created_at=get(_P_CA),
+                updated_at=get(_P_UA)
+            )
+            
+            append(SearchResult(
+                document=document,
+                score=result.score,
+                search_type=search_type
+            ))
         
-        # Sort by combined score
-        return sorted(combined.values(), key=lambda x: x.score, reverse=True)
+        return results
     
     def _build_qdrant_filter(self, filters: Dict) -> Filter:
         """Build Qdrant filter from filters dict"""
@@ -324,7 +892,7 @@ class QdrantRAGService:
                 conditions.append(
                     FieldCondition(
                         key=key,
-                        match=MatchValue(value=value)
+                        match=MatchAny(any=value)
                     )
                 )
             else:
@@ -343,7 +911,7 @@ class QdrantRAGService:
         collection_id = f"{tenant_id}_{collection_name}"
         
         try:
-            info = self.client.get_collection(collection_id)
+            info = await self.client.get_collection(collection_id)
             
             return {
                 "collection_id": collection_id,
@@ -365,10 +933,12 @@ class QdrantRAGService:
         collection_id = f"{tenant_id}_{collection_name}"
         
         try:
-            self.client.delete(
+            await self.client.delete(
                 collection_name=collection_id,
                 points_selector=[document_id]
             )
+            self.query_cache.invalidate(collection_id)
+            self.hot_vectors.invalidate(collection_id, [document_id])
             
             logger.info(f"Deleted document {document_id} from {collection_id}")
             return True
@@ -385,7 +955,7 @@ class QdrantRAGService:
     async def list_collections(self, tenant_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """List collections, optionally filtered by tenant"""
         try:
-            collections = self.client.get_collections()
+            collections = await self.client.get_collections()
             
             result = []
             for collection in collections.collections:
@@ -412,11 +982,19 @@ class QdrantRAGService:
             logger.error(f"Failed to list collections: {e}")
             raise
     
+    async def aclose(self):
+        """Flush pending writes and release clients and worker threads"""
+        await self.point_buffer.close()
+        await self.text_batcher.close()
+        await self.multimodal_batcher.close()
+        self._encode_pool.shutdown(wait=False)
+        await self.client.close()
+    
     async def health_check(self) -> Dict[str, Any]:
         """Health check for Qdrant service"""
         try:
             # Check if Qdrant is accessible
-            collections = self.client.get_collections()
+            collections = await self.client.get_collections()
             
             return {
                 "status": "healthy",
@@ -435,16 +1013,35 @@ class QdrantRAGService:
             }
 
 
-# Global instance
-qdrant_rag_service = QdrantRAGService()
-
-
 # FastAPI integration
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the service on the serving loop and release it on shutdown"""
+    svc = QdrantRAGService(
+        qdrant_host=os.getenv("QDRANT_HOST", "localhost"),
+        qdrant_port=int(os.getenv("QDRANT_PORT", "6333")),
+        qdrant_grpc_port=int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+    )
+    await svc._initialize_collections()
+    app.state.svc = svc
+    try:
+        yield
+    finally:
+        await svc.aclose()
+
 
-app = FastAPI(title="Qdrant RAG Service")
+app = FastAPI(
+    title="Qdrant RAG Service",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -456,14 +1053,22 @@ app.add_middleware(
 
 
 class DocumentIn(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     content: str
     metadata: Dict[str, Any] = {}
-    document_type: str = "text"
+    document_type: DocumentType = DocumentType.TEXT
     tenant_id: str = "default"
     collection_name: str = "documents"
+    
+    def to_payload(self, tenant_id: str, collection_name: str) -> Dict[str, Any]:
+        """Point payload for this document, without an intermediate Document"""
+        return _build_payload(self.content, self.metadata, self.document_type, tenant_id, collection_name)
 
 
 class SearchRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     query: str
     search_type: str = "vector"
     limit: int = 10
@@ -472,36 +1077,33 @@ class SearchRequest(BaseModel):
 
 
 @app.post("/collections/{tenant_id}/{collection_name}")
-async def create_collection_endpoint(tenant_id: str, collection_name: str):
+async def create_collection_endpoint(request: Request, tenant_id: str, collection_name: str):
     """Create new collection for tenant"""
     try:
-        collection_id = await qdrant_rag_service.create_collection(tenant_id, collection_name)
+        collection_id = await request.app.state.svc.create_collection(tenant_id, collection_name)
         return {"collection_id": collection_id, "status": "created"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/documents/{tenant_id}/{collection_name}")
-async def ingest_document_endpoint(tenant_id: str, collection_name: str, document: DocumentIn):
+async def ingest_document_endpoint(request: Request, tenant_id: str, collection_name: str, document: DocumentIn):
     """Ingest document into collection"""
     try:
-        doc = Document(
-            id=str(uuid.uuid4()),
-            content=document.content,
-            metadata=document.metadata,
-            document_type=DocumentType(document.document_type),
-            tenant_id=tenant_id,
-            collection_name=collection_name
+        document_id = str(uuid.uuid4())
+        await request.app.state.svc.ingest_payload(
+            document_id,
+            document.to_payload(tenant_id, collection_name),
+            document.document_type
         )
-        
-        result = await qdrant_rag_service.ingest_document(doc)
-        return {"document_id": result.id, "status": "ingested"}
+        return {"document_id": document_id, "status": "ingested"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/search/{tenant_id}/{collection_name}")
 async def search_documents_endpoint(
+    request: Request,
     tenant_id: str,
     collection_name: str,
     query: str,
@@ -512,7 +1114,7 @@ async def search_documents_endpoint(
 ):
     """Search documents in collection"""
     try:
-        results = await qdrant_rag_service.search(
+        results = await request.app.state.svc.search(
             tenant_id, collection_name, query,
             SearchType(search_type), limit, filters, score_threshold
         )
@@ -539,39 +1141,39 @@ async def search_documents_endpoint(
 
 
 @app.get("/collections/{tenant_id}/{collection_name}/stats")
-async def get_collection_stats_endpoint(tenant_id: str, collection_name: str):
+async def get_collection_stats_endpoint(request: Request, tenant_id: str, collection_name: str):
     """Get collection statistics"""
     try:
-        stats = await qdrant_rag_service.get_collection_stats(tenant_id, collection_name)
+        stats = await request.app.state.svc.get_collection_stats(tenant_id, collection_name)
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/documents/{tenant_id}/{collection_name}/{document_id}")
-async def delete_document_endpoint(tenant_id: str, collection_name: str, document_id: str):
+async def delete_document_endpoint(request: Request, tenant_id: str, collection_name: str, document_id: str):
     """Delete document from collection"""
     try:
-        success = await qdrant_rag_service.delete_document(tenant_id, collection_name, document_id)
+        success = await request.app.state.svc.delete_document(tenant_id, collection_name, document_id)
         return {"status": "deleted" if success else "failed"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/collections")
-async def list_collections_endpoint(tenant_id: Optional[str] = None):
+async def list_collections_endpoint(request: Request, tenant_id: Optional[str] = None):
     """List collections"""
     try:
-        collections = await qdrant_rag_service.list_collections(tenant_id)
+        collections = await request.app.state.svc.list_collections(tenant_id)
         return {"collections": collections}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/health")
-async def health_check_endpoint():
+async def health_check_endpoint(request: Request):
     """Health check endpoint"""
-    return await qdrant_rag_service.health_check()
+    return await request.app.state.svc.health_check()
 
 
 if __name__ == "__main__":
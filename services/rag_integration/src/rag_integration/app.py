@@ -7,19 +7,172 @@ and knowledge retrieval for agentic workflows.
 
 from __future__ import annotations
 import asyncio
+import functools
+import io
 import json
+import os
 import time
-from typing import Dict, List, Optional, Any, Union
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 import httpx
-from qdrant_client import QdrantClient
+import msgspec
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    FieldCondition, Filter, MatchAny, MatchValue, PayloadSchemaType, QuantizationSearchParams,
+    QueryRequest, SearchParams
+)
+
+# Encoder threads; OpenMP/MKL read these once, before torch is first imported
+ENCODER_THREADS = int(os.getenv("RAG_ENCODER_THREADS", max(1, (os.cpu_count() or 2) // 2)))
+os.environ.setdefault("OMP_NUM_THREADS", str(ENCODER_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(ENCODER_THREADS))
+
 from sentence_transformers import SentenceTransformer
+import torch
 import logging
 import uuid
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2)
+except Exception:  # pragma: no cover
+    h2 = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+TEXT_ENCODER_MODEL = "all-MiniLM-L6-v2"
+
+# "quantized" runs the encoder as ONNX Runtime INT8 on CPU; "fp32" keeps the
+# reference PyTorch model for A/B checks
+ENCODER_PRECISION = os.getenv("RAG_ENCODER_PRECISION", "quantized")
+ONNX_INT8_MODEL_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Retrieval results are reused for repeated and near-identical queries; entries
+# expire after the TTL so writes from other processes become visible (0 disables)
+RETRIEVAL_CACHE_SIZE = 10_000
+RETRIEVAL_CACHE_TTL_S = float(os.getenv("RAG_RETRIEVAL_CACHE_TTL", "30"))
+SEMANTIC_CACHE_THRESHOLD = 0.97
+
+# INT8 vectors are searched with oversampling and rescored against the originals
+QUANTIZED_SEARCH_PARAMS = SearchParams(
+    quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
+# Large ingests are split into chunks that stay under gRPC message limits
+UPSERT_CHUNK_SIZE = 256
+UPSERT_CONCURRENCY = 8
+
+# Model gateway connections idle longer than this are re-warmed alongside retrieval
+GATEWAY_KEEPALIVE_S = 5.0
+_JSON_HEADERS = {"content-type": "application/json"}
+_NDJSON_HEADERS = {"content-type": "application/x-ndjson"}
+
+# Opt-in: stream context documents to the model gateway as NDJSON frames until
+# it answers 415/422, after which whole prompts are sent. Off by default because
+# the in-repo model gateway only accepts whole JSON prompts
+GATEWAY_STREAMING = os.getenv("RAG_GATEWAY_STREAMING", "0") == "1"
+
+HEALTH_CACHE_TTL_S = 2.0
+
+# Prompt templates
+_GEN_HEADER_FMT = "Based on the following context, please provide a comprehensive response to: {q}\n\nContext:\n"
+_GEN_FOOTER = "\n\nResponse:"
+_QA_HEADER_FMT = "Based on the following context, please answer the question: {q}\n\nContext:\n"
+_QA_FOOTER = "\n\nAnswer:"
+_SUMMARY_HEADER = "Please provide a concise summary of the following documents:\n\n"
+_SUMMARY_FOOTER = "\n\nSummary:"
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is None:
+        return json.dumps(value).encode()
+    return orjson.dumps(value)
+
+
+def _loads(content: bytes) -> Any:
+    if orjson is None:
+        return json.loads(content)
+    return orjson.loads(content)
+
+
+def _build_prompt(header: str, documents: List[Dict[str, Any]], footer: str) -> str:
+    """Write header, numbered documents and footer into a single buffer"""
+    buf = io.StringIO()
+    buf.write(header)
+    for i, doc in enumerate(documents):
+        if i:
+            buf.write("\n\n")
+        buf.write(f"Document {i+1}:\n")
+        buf.write(doc.get("content", ""))
+    buf.write(footer)
+    return buf.getvalue()
+
+
+def _payload_schema(value: Any) -> PayloadSchemaType:
+    """Payload index type matching a filter value"""
+    if isinstance(value, bool):
+        return PayloadSchemaType.BOOL
+    if isinstance(value, int):
+        return PayloadSchemaType.INTEGER
+    if isinstance(value, float):
+        return PayloadSchemaType.FLOAT
+    return PayloadSchemaType.KEYWORD
+
+
+@functools.lru_cache(maxsize=4096)
+def _compiled_filter(frozen: Tuple[Tuple[str, Any], ...]) -> Filter:
+    """Qdrant filter for canonicalized (key, value) pairs; tuples match any element"""
+    conditions = []
+    
+    for key, value in frozen:
+        if isinstance(value, (list, tuple)):
+            conditions.append(FieldCondition(key=key, match=MatchAny(any=list(value))))
+        else:
+            conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
+    
+    return Filter(must=conditions)
+
+
+def _load_encoder() -> SentenceTransformer:
+    """Load the query/document encoder at the configured precision"""
+    torch.set_num_threads(ENCODER_THREADS)
+    if ENCODER_PRECISION == "fp32":
+        return _load_torch_encoder()
+    
+    try:
+        return SentenceTransformer(
+            TEXT_ENCODER_MODEL,
+            backend="onnx",
+            model_kwargs={"file_name": ONNX_INT8_MODEL_FILE, "provider": "CPUExecutionProvider"}
+        )
+    except Exception as e:
+        logger.warning(f"INT8 ONNX encoder unavailable, using FP32: {e}")
+        return _load_torch_encoder()
+
+
+def _load_torch_encoder() -> SentenceTransformer:
+    """PyTorch encoder with the transformer compiled where torch.compile is supported"""
+    encoder = SentenceTransformer(TEXT_ENCODER_MODEL)
+    eager_model = encoder[0].auto_model
+    try:
+        # dynamic shapes avoid a recompile per batch size / sequence length
+        encoder[0].auto_model = torch.compile(eager_model, dynamic=True)
+        # compilation is lazy; force it here so failures fall back instead of surfacing per request
+        with torch.inference_mode():
+            encoder.encode(["warmup"], normalize_embeddings=True)
+    except Exception as e:
+        logger.warning(f"torch.compile unavailable for the encoder, running eager: {e}")
+        encoder[0].auto_model = eager_model
+    return encoder
+
 
 class RAGNodeType(Enum):
     """RAG node types for workflows"""
@@ -41,8 +194,7 @@ class RAGContext:
     metadata_filters: Optional[Dict[str, Any]] = None
 
 
-@dataclass
-class RAGResult:
+class RAGResult(msgspec.Struct):
     """RAG operation result"""
     success: bool
     documents: List[Dict[str, Any]]
@@ -53,22 +205,149 @@ class RAGResult:
     metadata: Optional[Dict[str, Any]] = None
 
 
+def _digest(*parts: Any) -> bytes:
+    return blake2b("|".join(map(str, parts)).encode(), digest_size=8).digest()
+
+
+class RetrievalCache:
+    """Two-tier retrieval cache: exact query hash, then query-embedding similarity
+    
+    Both tiers are scoped by collection, filters, threshold and result count.
+    Semantic entries live in a fixed ring of L2-normalized vectors, so a lookup
+    is one matrix-vector product over the ring. Entries expire after ``ttl``
+    seconds; a per-collection generation, bumped by ``invalidate``, keeps
+    searches that started before a write from caching pre-write results.
+    """
+    
+    def __init__(self, capacity: int = RETRIEVAL_CACHE_SIZE,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 ttl: float = RETRIEVAL_CACHE_TTL_S):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self._exact: OrderedDict[bytes, Tuple[str, float, List[Dict[str, Any]]]] = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None
+        self._scopes = np.zeros(capacity, dtype=np.int64)
+        self._collections = np.zeros(capacity, dtype=np.int64)
+        self._expires = np.zeros(capacity, dtype=np.float64)
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._documents: List[Optional[List[Dict[str, Any]]]] = [None] * capacity
+        self._next = 0
+        self._generations: Dict[str, int] = {}
+    
+    @staticmethod
+    def scope(collection_id: str, context: RAGContext) -> bytes:
+        filters = json.dumps(context.metadata_filters, sort_keys=True, default=str)
+        return _digest(collection_id, filters, context.similarity_threshold, context.max_documents)
+    
+    @staticmethod
+    def key(scope: bytes, query: str) -> bytes:
+        return _digest(scope.hex(), query)
+    
+    def generation(self, collection_id: str) -> int:
+        """Current write generation; pass it back to ``put`` to drop results that raced a write"""
+        return self._generations.get(collection_id, 0)
+    
+    def get_exact(self, key: bytes) -> Optional[List[Dict[str, Any]]]:
+        entry = self._exact.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._exact[key]
+            return None
+        self._exact.move_to_end(key)
+        return entry[2]
+    
+    def get_similar(self, scope: bytes, vector: np.ndarray) -> Optional[List[Dict[str, Any]]]:
+        if self._vectors is None:
+            return None
+        candidates = (
+            self._valid
+            & (self._scopes == int.from_bytes(scope, "little", signed=True))
+            & (self._expires > time.monotonic())
+        )
+        if not candidates.any():
+            return None
+        similarities = np.where(candidates, self._vectors @ vector, -np.inf)
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return self._documents[best]
+        return None
+    
+    def put(self, collection_id: str, scope: bytes, key: bytes, vector: np.ndarray,
+            documents: List[Dict[str, Any]], generation: int):
+        if self.ttl <= 0 or generation != self.generation(collection_id):
+            return
+        expires_at = time.monotonic() + self.ttl
+        self._exact[key] = (collection_id, expires_at, documents)
+        self._exact.move_to_end(key)
+        if len(self._exact) > self.capacity:
+            self._exact.popitem(last=False)
+        
+        if self._vectors is None:
+            self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+        row = self._next
+        self._vectors[row] = vector
+        self._scopes[row] = int.from_bytes(scope, "little", signed=True)
+        self._collections[row] = int.from_bytes(_digest(collection_id), "little", signed=True)
+        self._expires[row] = expires_at
+        self._valid[row] = True
+        self._documents[row] = documents
+        self._next = (row + 1) % self.capacity
+    
+    def invalidate(self, collection_id: str):
+        """Forget results for a collection whose contents changed"""
+        self._generations[collection_id] = self.generation(collection_id) + 1
+        for key in [key for key, entry in self._exact.items() if entry[0] == collection_id]:
+            del self._exact[key]
+        self._valid &= self._collections != int.from_bytes(_digest(collection_id), "little", signed=True)
+
+
 class RAGIntegrationService:
     """RAG integration service for AOB platform"""
     
     def __init__(self, qdrant_host: str = "localhost", qdrant_port: int = 6333):
         self.qdrant_host = qdrant_host
         self.qdrant_port = qdrant_port
-        self.client = QdrantClient(host=qdrant_host, port=qdrant_port)
+        self.client = AsyncQdrantClient(
+            host=qdrant_host,
+            port=qdrant_port,
+            grpc_port=6334,
+            prefer_grpc=True,
+            timeout=30,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=100)
+        )
         
         # Embedding model
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.encoder = _load_encoder()
         
         # HTTP client for API calls
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        self.http_client = httpx.AsyncClient(
+            http2=h2 is not None,
+            timeout=httpx.Timeout(30.0, connect=2.0),
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+            headers={"connection": "keep-alive"}
+        )
         
         # Model gateway endpoint
         self.model_gateway_url = "http://localhost:8087"
+        self._gateway_warm_until = 0.0
+        self._gateway_streaming = GATEWAY_STREAMING
+        
+        # Collections known to exist, so ingest skips the existence check
+        self._known_collections: set[str] = set()
+        self._known_lock = asyncio.Lock()
+        self._known_indexes: set[Tuple[str, str]] = set()
+        
+        # Caps concurrent upsert requests across all ingests
+        self._upsert_semaphore = asyncio.Semaphore(UPSERT_CONCURRENCY)
+        
+        # Health probes share one upstream check per TTL window
+        self._health_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._health_lock = asyncio.Lock()
+        
+        # Repeated and near-identical queries skip encoding and search
+        self.retrieval_cache = RetrievalCache()
         
     async def execute_rag_node(self, node_type: RAGNodeType, context: RAGContext, 
                               tenant_id: str = "default", collection_name: str = "documents") -> RAGResult:
@@ -115,27 +394,140 @@ class RAGIntegrationService:
                                  collection_name: str) -> Dict[str, Any]:
         """Retrieve relevant documents using semantic search"""
         collection_id = f"{tenant_id}_{collection_name}"
+        scope = RetrievalCache.scope(collection_id, context)
+        cache_key = RetrievalCache.key(scope, context.query)
+        generation = self.retrieval_cache.generation(collection_id)
+        
+        documents = self.retrieval_cache.get_exact(cache_key)
+        if documents is None:
+            if context.metadata_filters:
+                await self._index_filter_fields(collection_id, context.metadata_filters)
+            
+            # Generate query embeddings
+            with torch.inference_mode():
+                query_embeddings = self.encoder.encode(context.query, normalize_embeddings=True)
+            documents = self.retrieval_cache.get_similar(scope, query_embeddings)
+            if documents is None:
+                request = self._query_request(context, query_embeddings)
+                response = await self.client.query_points(
+                    collection_name=collection_id,
+                    query=request.query,
+                    query_filter=request.filter,
+                    search_params=request.params,
+                    limit=request.limit,
+                    score_threshold=request.score_threshold,
+                    with_payload=True
+                )
+                documents = self._points_to_documents(response.points)
+                self.retrieval_cache.put(collection_id, scope, cache_key, query_embeddings, documents, generation)
+        
+        return self._retrieval_result(collection_id, context, documents)
+    
+    async def retrieve_many(self, contexts: List[RAGContext], tenant_id: str = "default",
+                            collection_name: str = "documents") -> List[RAGResult]:
+        """Retrieve for many contexts with one batched encode and one batched Qdrant query"""
+        start_time = time.time()
+        collection_id = f"{tenant_id}_{collection_name}"
+        scopes = [RetrievalCache.scope(collection_id, context) for context in contexts]
+        cache_keys = [RetrievalCache.key(scope, context.query) for scope, context in zip(scopes, contexts)]
+        generation = self.retrieval_cache.generation(collection_id)
+        found = [self.retrieval_cache.get_exact(cache_key) for cache_key in cache_keys]
         
-        # Generate query embeddings
-        query_embeddings = self.encoder.encode(context.query).tolist()
+        try:
+            pending = [i for i, documents in enumerate(found) if documents is None]
+            if pending:
+                with torch.inference_mode():
+                    vectors = self.encoder.encode(
+                        [contexts[i].query for i in pending],
+                        batch_size=64,
+                        normalize_embeddings=True
+                    )
+                misses = []
+                for i, vector in zip(pending, vectors):
+                    found[i] = self.retrieval_cache.get_similar(scopes[i], vector)
+                    if found[i] is None:
+                        misses.append((i, vector))
+                
+                if misses:
+                    for i, _ in misses:
+                        if contexts[i].metadata_filters:
+                            await self._index_filter_fields(collection_id, contexts[i].metadata_filters)
+                    responses = await self.client.query_batch_points(
+                        collection_name=collection_id,
+                        requests=[self._query_request(contexts[i], vector) for i, vector in misses]
+                    )
+                    for (i, vector), response in zip(misses, responses):
+                        found[i] = self._points_to_documents(response.points)
+                        self.retrieval_cache.put(collection_id, scopes[i], cache_keys[i], vector, found[i], generation)
         
-        # Build filter
+        except Exception as e:
+            logger.error(f"Batched retrieval failed for {collection_id}: {e}")
+            latency_ms = (time.time() - start_time) * 1000
+            return [
+                RAGResult(
+                    success=False,
+                    documents=[],
+                    query=context.query,
+                    node_type=RAGNodeType.RETRIEVE,
+                    latency_ms=latency_ms,
+                    error=str(e)
+                )
+                for context in contexts
+            ]
+        
+        latency_ms = (time.time() - start_time) * 1000
+        results = []
+        for context, documents in zip(contexts, found):
+            result = self._retrieval_result(collection_id, context, documents)
+            results.append(RAGResult(
+                success=True,
+                documents=result["documents"],
+                query=context.query,
+                node_type=RAGNodeType.RETRIEVE,
+                latency_ms=latency_ms,
+                metadata=result["metadata"]
+            ))
+        return results
+    
+    async def _index_filter_fields(self, collection_id: str, filters: Dict[str, Any]):
+        """Create payload indexes for filter fields the first time a collection is filtered on them"""
+        for key, value in filters.items():
+            if (collection_id, key) in self._known_indexes:
+                continue
+            self._known_indexes.add((collection_id, key))
+            sample = value[0] if isinstance(value, list) and value else value
+            try:
+                await self.client.create_payload_index(
+                    collection_name=collection_id,
+                    field_name=key,
+                    field_schema=_payload_schema(sample),
+                    wait=False
+                )
+            except Exception as e:
+                # Retry on the next filtered query instead of giving up for the process lifetime
+                self._known_indexes.discard((collection_id, key))
+                logger.warning(f"Failed to index payload field {key} on {collection_id}: {e}")
+    
+    def _query_request(self, context: RAGContext, query_embeddings: np.ndarray) -> QueryRequest:
+        """Build the Qdrant query for a retrieval context"""
         qdrant_filter = None
         if context.metadata_filters:
             qdrant_filter = self._build_qdrant_filter(context.metadata_filters)
         
-        # Search in Qdrant
-        search_results = self.client.search(
-            collection_name=collection_id,
-            query_vector=query_embeddings,
+        return QueryRequest(
+            query=query_embeddings.tolist(),
+            filter=qdrant_filter,
+            params=QUANTIZED_SEARCH_PARAMS,
             limit=context.max_documents,
-            query_filter=qdrant_filter,
             score_threshold=context.similarity_threshold,
             with_payload=True
         )
-        
+    
+    @staticmethod
+    def _points_to_documents(points: List[Any]) -> List[Dict[str, Any]]:
+        """Convert scored Qdrant points into document dicts"""
         documents = []
-        for result in search_results:
+        for result in points:
             documents.append({
                 "id": result.id,
                 "content": result.payload["content"],
@@ -144,6 +536,11 @@ class RAGIntegrationService:
                 "document_type": result.payload.get("document_type", "text")
             })
         
+        return documents
+    
+    @staticmethod
+    def _retrieval_result(collection_id: str, context: RAGContext,
+                          documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         return {
             "documents": documents,
             "metadata": {
@@ -156,8 +553,11 @@ class RAGIntegrationService:
     async def _generate_with_context(self, context: RAGContext, tenant_id: str, 
                                    collection_name: str) -> Dict[str, Any]:
         """Generate text using retrieved context"""
-        # First retrieve documents
-        retrieve_result = await self._retrieve_documents(context, tenant_id, collection_name)
+        # Retrieve documents while the model gateway connection is warmed
+        retrieve_result, _ = await asyncio.gather(
+            self._retrieve_documents(context, tenant_id, collection_name),
+            self._prewarm_model()
+        )
         documents = retrieve_result["documents"]
         
         if not documents:
@@ -166,33 +566,15 @@ class RAGIntegrationService:
                 "metadata": {"error": "No relevant documents found"}
             }
         
-        # Prepare context for generation
-        context_text = "\n\n".join([
-            f"Document {i+1}:\n{doc['content']}" 
-            for i, doc in enumerate(documents)
-        ])
-        
-        # Generate prompt
-        prompt = f"""Based on the following context, please provide a comprehensive response to: {context.query}
-
-Context:
-{context_text}
-
-Response:"""
-        
         # Call model gateway
         try:
-            response = await self.http_client.post(
-                f"{self.model_gateway_url}/infer",
-                json={
-                    "prompt": prompt,
-                    "max_tokens": 1000,
-                    "temperature": 0.7
-                }
+            response = await self._infer_with_context(
+                _GEN_HEADER_FMT.format(q=context.query), documents, _GEN_FOOTER,
+                {"max_tokens": 1000, "temperature": 0.7}
             )
             
             if response.status_code == 200:
-                model_result = response.json()
+                model_result = _loads(response.content)
                 generated_text = model_result["text"]
                 
                 return {
@@ -230,14 +612,16 @@ Response:"""
         
         # Simple reranking based on content length and metadata
         # In production, this would use a cross-encoder model
-        reranked_docs = sorted(
-            context.documents,
-            key=lambda x: (
-                x.get("score", 0) * 0.7 +  # Original similarity score
-                min(len(x.get("content", "")) / 1000, 1.0) * 0.3  # Content length bonus
-            ),
-            reverse=True
+        documents = context.documents
+        count = len(documents)
+        scores = np.fromiter((doc.get("score", 0) for doc in documents), dtype=np.float64, count=count)
+        lengths = np.fromiter((len(doc.get("content", "")) for doc in documents), dtype=np.float64, count=count)
+        combined = (
+            scores * 0.7 +  # Original similarity score
+            np.minimum(lengths / 1000, 1.0) * 0.3  # Content length bonus
         )
+        order = np.argsort(-combined, kind="stable")
+        reranked_docs = [documents[i] for i in order]
         
         return {
             "documents": reranked_docs,
@@ -253,32 +637,15 @@ Response:"""
         if not context.documents:
             return {"documents": [], "metadata": {"error": "No documents to summarize"}}
         
-        # Combine document content
-        combined_content = "\n\n".join([
-            f"Document {i+1}:\n{doc.get('content', '')}" 
-            for i, doc in enumerate(context.documents)
-        ])
-        
-        # Generate summary prompt
-        prompt = f"""Please provide a concise summary of the following documents:
-
-{combined_content}
-
-Summary:"""
-        
         # Call model gateway for summarization
         try:
-            response = await self.http_client.post(
-                f"{self.model_gateway_url}/infer",
-                json={
-                    "prompt": prompt,
-                    "max_tokens": 500,
-                    "temperature": 0.3
-                }
+            response = await self._infer_with_context(
+                _SUMMARY_HEADER, context.documents, _SUMMARY_FOOTER,
+                {"max_tokens": 500, "temperature": 0.3}
             )
             
             if response.status_code == 200:
-                model_result = response.json()
+                model_result = _loads(response.content)
                 summary = model_result["text"]
                 
                 return {
@@ -312,8 +679,11 @@ Summary:"""
     async def _question_answer(self, context: RAGContext, tenant_id: str, 
                              collection_name: str) -> Dict[str, Any]:
         """Answer questions using retrieved context"""
-        # First retrieve relevant documents
-        retrieve_result = await self._retrieve_documents(context, tenant_id, collection_name)
+        # Retrieve relevant documents while the model gateway connection is warmed
+        retrieve_result, _ = await asyncio.gather(
+            self._retrieve_documents(context, tenant_id, collection_name),
+            self._prewarm_model()
+        )
         documents = retrieve_result["documents"]
         
         if not documents:
@@ -322,33 +692,15 @@ Summary:"""
                 "metadata": {"error": "No relevant documents found for question"}
             }
         
-        # Prepare context for Q&A
-        context_text = "\n\n".join([
-            f"Document {i+1}:\n{doc['content']}" 
-            for i, doc in enumerate(documents)
-        ])
-        
-        # Generate Q&A prompt
-        prompt = f"""Based on the following context, please answer the question: {context.query}
-
-Context:
-{context_text}
-
-Answer:"""
-        
         # Call model gateway
         try:
-            response = await self.http_client.post(
-                f"{self.model_gateway_url}/infer",
-                json={
-                    "prompt": prompt,
-                    "max_tokens": 800,
-                    "temperature": 0.5
-                }
+            response = await self._infer_with_context(
+                _QA_HEADER_FMT.format(q=context.query), documents, _QA_FOOTER,
+                {"max_tokens": 800, "temperature": 0.5}
             )
             
             if response.status_code == 200:
-                model_result = response.json()
+                model_result = _loads(response.content)
                 answer = model_result["text"]
                 
                 return {
@@ -381,87 +733,161 @@ Answer:"""
                 "metadata": {"error": f"Q&A failed: {str(e)}"}
             }
     
-    def _build_qdrant_filter(self, filters: Dict) -> Any:
-        """Build Qdrant filter from filters dict"""
-        from qdrant_client.models import Filter, FieldCondition, MatchValue
-        
-        conditions = []
-        
-        for key, value in filters.items():
-            if isinstance(value, list):
-                # Handle list values
-                conditions.append(
-                    FieldCondition(
-                        key=key,
-                        match=MatchValue(value=value)
-                    )
-                )
-            else:
-                # Handle single values
-                conditions.append(
-                    FieldCondition(
-                        key=key,
-                        match=MatchValue(value=value)
-                    )
-                )
-        
-        return Filter(must=conditions)
+    async def _infer(self, payload: Dict[str, Any]) -> httpx.Response:
+        """POST a pre-serialized inference request to the model gateway"""
+        response = await self.http_client.post(
+            f"{self.model_gateway_url}/infer",
+            content=_dumps(payload),
+            headers=_JSON_HEADERS
+        )
+        self._gateway_warm_until = time.monotonic() + GATEWAY_KEEPALIVE_S
+        return response
     
-    async def ingest_workflow_documents(self, tenant_id: str, collection_name: str, 
-                                      documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Ingest documents for workflow use"""
-        collection_id = f"{tenant_id}_{collection_name}"
+    async def _infer_with_context(self, header: str, documents: List[Dict[str, Any]], footer: str,
+                                  params: Dict[str, Any]) -> httpx.Response:
+        """Send a prompt as streamed NDJSON frames, or as one body if the gateway rejects them"""
+        if self._gateway_streaming:
+            async def _iter_frames():
+                yield _dumps({"role": "header", "header": header, "footer": footer, **params}) + b"\n"
+                for i, doc in enumerate(documents):
+                    yield _dumps({"role": "doc", "i": i, "content": doc.get("content", "")}) + b"\n"
+                yield b'{"role":"end"}\n'
+            
+            async with self.http_client.stream(
+                "POST",
+                f"{self.model_gateway_url}/infer",
+                content=_iter_frames(),
+                headers=_NDJSON_HEADERS
+            ) as response:
+                if response.status_code not in (415, 422):
+                    await response.aread()
+                    self._gateway_warm_until = time.monotonic() + GATEWAY_KEEPALIVE_S
+                    return response
+            
+            self._gateway_streaming = False
+            logger.info("Model gateway does not accept NDJSON context frames; sending whole prompts")
         
-        # Ensure collection exists
+        return await self._infer({"prompt": _build_prompt(header, documents, footer), **params})
+    
+    async def _prewarm_model(self):
+        """Open a model gateway connection unless one was used recently"""
+        if time.monotonic() < self._gateway_warm_until:
+            return
         try:
-            collections = self.client.get_collections()
-            existing_names = [col.name for col in collections.collections]
-            
-            if collection_id not in existing_names:
-                from qdrant_client.models import VectorParams, Distance
-                self.client.create_collection(
+            await self.http_client.get(f"{self.model_gateway_url}/health", timeout=1.0)
+            self._gateway_warm_until = time.monotonic() + GATEWAY_KEEPALIVE_S
+        except Exception:
+            pass
+    
+    def _build_qdrant_filter(self, filters: Dict) -> Any:
+        """Build Qdrant filter from filters dict, reusing filters built before"""
+        try:
+            frozen = tuple(sorted(
+                (key, tuple(value) if isinstance(value, list) else value)
+                for key, value in filters.items()
+            ))
+            return _compiled_filter(frozen)
+        except TypeError:
+            # Unhashable filter values are built uncached
+            return _compiled_filter.__wrapped__(tuple(filters.items()))
+    
+    async def _ensure_collection(self, collection_id: str):
+        """Create a workflow collection if Qdrant does not have it yet"""
+        try:
+            if not await self.client.collection_exists(collection_id):
+                from qdrant_client.models import (
+                    VectorParams, Distance, ScalarQuantization, ScalarQuantizationConfig,
+                    ScalarType, HnswConfigDiff
+                )
+                await self.client.create_collection(
                     collection_name=collection_id,
                     vectors_config=VectorParams(
                         size=384,  # all-MiniLM-L6-v2 size
-                        distance=Distance.COSINE
-                    )
+                        distance=Distance.DOT,  # embeddings are L2-normalized at encode time
+                        on_disk=False
+                    ),
+                    quantization_config=ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(
+                            type=ScalarType.INT8,
+                            quantile=0.99,
+                            always_ram=True
+                        )
+                    ),
+                    hnsw_config=HnswConfigDiff(m=16, ef_construct=128)
                 )
         except Exception as e:
             logger.error(f"Failed to create collection {collection_id}: {e}")
             raise
+    
+    async def _upsert_chunk(self, collection_id: str, points: List[Any]):
+        # wait=True so the cache invalidation that follows happens after the points are searchable
+        async with self._upsert_semaphore:
+            await self.client.upsert(
+                collection_name=collection_id,
+                points=points,
+                wait=True
+            )
+    
+    async def ingest_workflow_documents(self, tenant_id: str, collection_name: str, 
+                                      documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Ingest documents for workflow use"""
+        collection_id = f"{tenant_id}_{collection_name}"
+        
+        # Ensure collection exists
+        if collection_id not in self._known_collections:
+            async with self._known_lock:
+                if collection_id not in self._known_collections:
+                    await self._ensure_collection(collection_id)
+                    self._known_collections.add(collection_id)
         
-        # Ingest documents
+        # Ingest documents: one batched encode, then bounded concurrent chunked upserts
         ingested_count = 0
-        for doc in documents:
-            try:
-                # Generate embeddings
-                embeddings = self.encoder.encode(doc["content"]).tolist()
-                
-                # Create point
-                from qdrant_client.models import PointStruct
-                point = PointStruct(
+        try:
+            texts = [doc["content"] for doc in documents]
+            with torch.inference_mode():
+                vectors = self.encoder.encode(
+                    texts,
+                    batch_size=64,
+                    show_progress_bar=False,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+            
+            from qdrant_client.models import PointStruct
+            # Tenant and collection are implied by the collection id
+            created_at = int(time.time())
+            points = [
+                PointStruct(
                     id=doc.get("id", str(uuid.uuid4())),
-                    vector=embeddings,
+                    vector=vector.tolist(),
                     payload={
                         "content": doc["content"],
                         "metadata": doc.get("metadata", {}),
                         "document_type": doc.get("document_type", "text"),
-                        "tenant_id": tenant_id,
-                        "collection_name": collection_name,
-                        "created_at": str(time.time())
+                        "created_at": created_at
                     }
                 )
-                
-                # Upsert to Qdrant
-                self.client.upsert(
-                    collection_name=collection_id,
-                    points=[point]
-                )
-                
-                ingested_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to ingest document {doc.get('id', 'unknown')}: {e}")
+                for doc, vector in zip(documents, vectors)
+            ]
+        except Exception as e:
+            logger.error(f"Failed to embed documents for {collection_id}: {e}")
+            points = []
+        
+        # Upsert to Qdrant
+        chunks = [points[i:i + UPSERT_CHUNK_SIZE] for i in range(0, len(points), UPSERT_CHUNK_SIZE)]
+        outcomes = await asyncio.gather(
+            *[self._upsert_chunk(collection_id, chunk) for chunk in chunks],
+            return_exceptions=True
+        )
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Failed to ingest {len(chunk)} documents into {collection_id}: {outcome}")
+                # Re-check the collection on the next ingest
+                self._known_collections.discard(collection_id)
+            else:
+                ingested_count += len(chunk)
+        if ingested_count:
+            self.retrieval_cache.invalidate(collection_id)
         
         return {
             "ingested_count": ingested_count,
@@ -469,43 +895,73 @@ Answer:"""
             "collection_id": collection_id
         }
     
+    async def aclose(self):
+        """Release the Qdrant and model gateway clients"""
+        await self.http_client.aclose()
+        await self.client.close()
+    
     async def health_check(self) -> Dict[str, Any]:
-        """Health check for RAG integration service"""
-        try:
-            # Check Qdrant connection
-            collections = self.client.get_collections()
-            
-            # Check model gateway
-            model_response = await self.http_client.get(f"{self.model_gateway_url}/health")
-            model_healthy = model_response.status_code == 200
-            
-            return {
-                "status": "healthy",
-                "qdrant_connected": True,
-                "qdrant_collections": len(collections.collections),
-                "model_gateway_healthy": model_healthy,
-                "timestamp": time.time()
-            }
-            
-        except Exception as e:
-            logger.error(f"RAG integration health check failed: {e}")
+        """Health check for RAG integration service, cached briefly across probes"""
+        cached = self._health_cache
+        if cached is not None and time.monotonic() - cached[0] < HEALTH_CACHE_TTL_S:
+            return dict(cached[1])
+        
+        async with self._health_lock:
+            cached = self._health_cache
+            if cached is None or time.monotonic() - cached[0] >= HEALTH_CACHE_TTL_S:
+                cached = self._health_cache = (time.monotonic(), await self._probe_health())
+        return dict(cached[1])
+    
+    async def _probe_health(self) -> Dict[str, Any]:
+        """Probe Qdrant and the model gateway concurrently"""
+        collections, model_response = await asyncio.gather(
+            self.client.get_collections(),
+            self.http_client.get(f"{self.model_gateway_url}/health", timeout=1.0),
+            return_exceptions=True
+        )
+        qdrant_connected = not isinstance(collections, BaseException)
+        model_reachable = not isinstance(model_response, BaseException)
+        
+        if not (qdrant_connected and model_reachable):
+            error = "; ".join(str(r) for r in (collections, model_response) if isinstance(r, BaseException))
+            logger.error(f"RAG integration health check failed: {error}")
             return {
                 "status": "unhealthy",
-                "error": str(e),
+                "error": error,
+                "qdrant_connected": qdrant_connected,
+                "model_gateway_healthy": model_reachable and model_response.status_code == 200,
                 "timestamp": time.time()
             }
-
-
-# Global instance
-rag_integration_service = RAGIntegrationService()
+        
+        return {
+            "status": "healthy",
+            "qdrant_connected": True,
+            "qdrant_collections": len(collections.collections),
+            "model_gateway_healthy": model_response.status_code == 200,
+            "timestamp": time.time()
+        }
 
 
 # FastAPI integration
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-app = FastAPI(title="RAG Integration Service")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the service on the serving loop, warm the encoder, and release it on shutdown"""
+    rag = RAGIntegrationService()
+    with torch.inference_mode():
+        rag.encoder.encode(["warmup"] * 8, normalize_embeddings=True)
+    app.state.rag = rag
+    try:
+        yield
+    finally:
+        await rag.aclose()
+
+
+app = FastAPI(title="RAG Integration Service", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -516,7 +972,7 @@ app.add_middleware(
 )
 
 
-class RAGContextIn(BaseModel):
+class RAGContextIn(msgspec.Struct):
     query: str
     documents: List[Dict[str, Any]] = []
     max_documents: int = 5
@@ -531,37 +987,79 @@ class DocumentIn(BaseModel):
     document_type: str = "text"
 
 
+def _to_rag_context(context: RAGContextIn) -> RAGContext:
+    return RAGContext(
+        query=context.query,
+        documents=context.documents,
+        max_documents=context.max_documents,
+        similarity_threshold=context.similarity_threshold,
+        rerank=context.rerank,
+        metadata_filters=context.metadata_filters
+    )
+
+
+def _rag(request: Request) -> RAGIntegrationService:
+    return request.app.state.rag
+
+
+def _decode_body(body: bytes, type_: Any) -> Any:
+    try:
+        return msgspec.json.decode(body, type=type_)
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _json_response(value: Any) -> Response:
+    return Response(content=msgspec.json.encode(value), media_type="application/json")
+
+
 @app.post("/rag/{node_type}")
 async def execute_rag_node_endpoint(
     node_type: str,
-    context: RAGContextIn,
+    request: Request,
     tenant_id: str = "default",
-    collection_name: str = "documents"
+    collection_name: str = "documents",
+    rag: RAGIntegrationService = Depends(_rag)
 ):
     """Execute RAG operation for workflow node"""
+    context = _decode_body(await request.body(), RAGContextIn)
     try:
-        rag_context = RAGContext(
-            query=context.query,
-            documents=context.documents,
-            max_documents=context.max_documents,
-            similarity_threshold=context.similarity_threshold,
-            rerank=context.rerank,
-            metadata_filters=context.metadata_filters
+        result = await rag.execute_rag_node(
+            RAGNodeType(node_type), _to_rag_context(context), tenant_id, collection_name
         )
         
-        result = await rag_integration_service.execute_rag_node(
-            RAGNodeType(node_type), rag_context, tenant_id, collection_name
-        )
+        return _json_response(result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/rag/batch/{node_type}")
+async def execute_rag_batch_endpoint(
+    node_type: str,
+    request: Request,
+    tenant_id: str = "default",
+    collection_name: str = "documents",
+    rag: RAGIntegrationService = Depends(_rag)
+):
+    """Execute one RAG operation over many contexts; retrieval is batched end to end"""
+    contexts = _decode_body(await request.body(), List[RAGContextIn])
+    try:
+        rag_node_type = RAGNodeType(node_type)
+        rag_contexts = [_to_rag_context(context) for context in contexts]
         
-        return {
-            "success": result.success,
-            "documents": result.documents,
-            "query": result.query,
-            "node_type": result.node_type.value,
-            "latency_ms": result.latency_ms,
-            "error": result.error,
-            "metadata": result.metadata
-        }
+        if rag_node_type == RAGNodeType.RETRIEVE:
+            results = await rag.retrieve_many(
+                rag_contexts, tenant_id, collection_name
+            )
+        else:
+            results = await asyncio.gather(*[
+                rag.execute_rag_node(
+                    rag_node_type, rag_context, tenant_id, collection_name
+                )
+                for rag_context in rag_contexts
+            ])
+        
+        return _json_response(results)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -570,7 +1068,8 @@ async def execute_rag_node_endpoint(
 async def ingest_documents_endpoint(
     tenant_id: str,
     collection_name: str,
-    documents: List[DocumentIn]
+    documents: List[DocumentIn],
+    rag: RAGIntegrationService = Depends(_rag)
 ):
     """Ingest documents for workflow use"""
     try:
@@ -583,7 +1082,7 @@ async def ingest_documents_endpoint(
             for doc in documents
         ]
         
-        result = await rag_integration_service.ingest_workflow_documents(
+        result = await rag.ingest_workflow_documents(
             tenant_id, collection_name, doc_list
         )
         
@@ -593,9 +1092,9 @@ async def ingest_documents_endpoint(
 
 
 @app.get("/health")
-async def health_check_endpoint():
+async def health_check_endpoint(rag: RAGIntegrationService = Depends(_rag)):
     """Health check endpoint"""
-    return await rag_integration_service.health_check()
+    return await rag.health_check()
 
 
 if __name__ == "__main__":
@@ -1,25 +1,48 @@
 from __future__ import annotations
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from pydantic import BaseModel
+import msgpack
+import redis.asyncio as aioredis
 
-app = FastAPI(title="Session Service")
+SESSION_TTL_SECS = 3600
 
-_sessions: dict[str, dict] = {}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the Redis pool on the serving loop and close it on shutdown"""
+    client = aioredis.from_url(
+        os.getenv("AOB_REDIS_URL", "redis://localhost:6379/0"),
+        decode_responses=False,
+        max_connections=100,
+    )
+    app.state.redis = client
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+app = FastAPI(title="Session Service", lifespan=lifespan)
+
+
+def _redis(request: Request) -> aioredis.Redis:
+    return request.app.state.redis
 
 class SessionCreate(BaseModel):
     agent_id: str
     input: dict
 
 @app.post("/tenants/{tenant}/sessions")
-async def create_session(tenant: str, body: SessionCreate):
+async def create_session(tenant: str, body: SessionCreate, redis: aioredis.Redis = Depends(_redis)):
     sid = f"{tenant}:{body.agent_id}"
-    _sessions[sid] = {"input": body.input}
+    await redis.set(f"session:{sid}", msgpack.packb({"input": body.input}), ex=SESSION_TTL_SECS)
     return {"session_id": sid}
 
 @app.get("/tenants/{tenant}/sessions/{sid}")
-async def get_session(tenant: str, sid: str):
-    data = _sessions.get(sid)
-    if not data:
+async def get_session(tenant: str, sid: str, redis: aioredis.Redis = Depends(_redis)):
+    raw = await redis.get(f"session:{sid}")
+    if not raw:
         return {"error": "not found"}
-    return {"session_id": sid, **data}
-
+    return {"session_id": sid, **msgpack.unpackb(raw)}
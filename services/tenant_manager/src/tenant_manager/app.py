@@ -8,18 +8,154 @@ from __future__ import annotations
 import asyncio
 import json
 import os
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass
+import re
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
 import asyncpg
 import httpx
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 import logging
 import hashlib
 import secrets
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import redis.asyncio as aioredis  # type: ignore
+except Exception:  # pragma: no cover
+    aioredis = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+def _dumps(value: Any) -> bytes:
+    if orjson is None:
+        return json.dumps(value).encode()
+    return orjson.dumps(value)
+
+
+def _loads(content: bytes) -> Any:
+    if orjson is None:
+        return json.loads(content)
+    return orjson.loads(content)
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Decode/encode jsonb in binary format (version byte 1 + JSON text) via orjson"""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=lambda value: b"\x01" + _dumps(value),
+        decoder=lambda data: _loads(data[1:]),
+        schema="pg_catalog",
+        format="binary"
+    )
+
+
+# search_path cannot be bound as a parameter, so schema names are whitelisted
+_SCHEMA_NAME_RE = re.compile(r"tenant_[a-z0-9_]+")
+
+# Per-tenant schema DDL, submitted as one multi-statement script
+_TENANT_SCHEMA_DDL = """
+CREATE SCHEMA IF NOT EXISTS {schema};
+
+CREATE TABLE IF NOT EXISTS {schema}.events (
+    id BIGSERIAL PRIMARY KEY,
+    correlation_id VARCHAR(255) NOT NULL,
+    event_type VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL,
+    timestamp TIMESTAMP DEFAULT NOW(),
+    causation_id VARCHAR(255),
+    idempotency_key VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS {schema}.snapshots (
+    id BIGSERIAL PRIMARY KEY,
+    correlation_id VARCHAR(255) NOT NULL,
+    snapshot_id VARCHAR(255) UNIQUE NOT NULL,
+    state JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    checksum VARCHAR(64)
+);
+
+CREATE TABLE IF NOT EXISTS {schema}.sessions (
+    id BIGSERIAL PRIMARY KEY,
+    session_id VARCHAR(255) UNIQUE NOT NULL,
+    correlation_id VARCHAR(255),
+    status VARCHAR(50) DEFAULT 'active',
+    created_at TIMESTAMP DEFAULT NOW(),
+    last_accessed TIMESTAMP DEFAULT NOW(),
+    metadata JSONB DEFAULT '{{}}'
+);
+
+CREATE TABLE IF NOT EXISTS {schema}.outbox (
+    id BIGSERIAL PRIMARY KEY,
+    event_id BIGINT REFERENCES {schema}.events(id),
+    topic VARCHAR(255) NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    delivered_at TIMESTAMP,
+    retry_count INTEGER DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_{schema}_events_correlation
+    ON {schema}.events(correlation_id);
+CREATE INDEX IF NOT EXISTS idx_{schema}_snapshots_correlation
+    ON {schema}.snapshots(correlation_id);
+CREATE INDEX IF NOT EXISTS idx_{schema}_outbox_undelivered
+    ON {schema}.outbox(delivered_at) WHERE delivered_at IS NULL;
+
+-- Grant permissions (placeholder - would be more sophisticated in production)
+GRANT USAGE ON SCHEMA {schema} TO aob_user;
+GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA {schema} TO aob_user;
+GRANT ALL PRIVILEGES ON ALL SEQUENCES IN SCHEMA {schema} TO aob_user;
+"""
+
+# Quota usage window; counters reset when it elapses
+QUOTA_WINDOW_S = int(os.getenv("AOB_QUOTA_WINDOW_S", "3600"))
+
+# Atomic windowed counter update: clamp at 0 and make sure the key always expires
+# (a release after the window lapsed must not leave a negative, immortal counter)
+_ADD_USAGE_LUA = """
+local used = redis.call('INCRBY', KEYS[1], ARGV[1])
+if used < 0 then
+    used = redis.call('INCRBY', KEYS[1], -used)
+end
+if redis.call('TTL', KEYS[1]) == -1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return used
+"""
+
+# Constant SQL text so every pooled connection reuses its cached prepared statement
+_LOAD_TENANTS_SQL = "SELECT * FROM tenants WHERE status != 'deleted'"
+_UPDATE_STATUS_SQL = "UPDATE tenants SET status = $2 WHERE tenant_id = $1"
+_TENANT_CREATE_LOCK_SQL = "SELECT pg_try_advisory_xact_lock(hashtext($1))"
+
+# Rows per cursor round-trip when loading tenants at startup
+_LOAD_PREFETCH = 256
+
+# Tenant schemas per DDL script when provisioning in bulk
+_DDL_BATCH_SCHEMAS = 50
+
+# Both tenant config rows in one statement
+_INSERT_TENANT_SQL = """
+    WITH ins AS (
+        INSERT INTO tenants (tenant_id, schema_name, encryption_key_encrypted, metadata, quotas, policies)
+        VALUES ($1, $2, $3, $4, $5, $6)
+        RETURNING tenant_id, schema_name
+    )
+    INSERT INTO tenant_schemas (schema_name, tenant_id)
+    SELECT schema_name, tenant_id FROM ins
+"""
+
 
 class TenantStatus(Enum):
     """Tenant status"""
@@ -28,7 +164,42 @@ class TenantStatus(Enum):
     DELETED = "deleted"
 
 
-@dataclass
+class TenantExistsError(ValueError):
+    """Tenant id already taken or being created concurrently"""
+
+
+class TenantCipher:
+    """AES-GCM tenant cipher that still reads legacy Fernet tokens"""
+    
+    VERSION_AESGCM = b"\x01"
+    NONCE_SIZE = 12
+    
+    def __init__(self, key: bytes):
+        if len(key) == 32:
+            self._aead = AESGCM(key)
+            self._fernet: Optional[Fernet] = None
+        else:
+            # Legacy Fernet key: keep it for old tokens, derive a separate AES-256 key for new ones
+            self._fernet = Fernet(key)
+            self._aead = AESGCM(HKDF(
+                algorithm=hashes.SHA256(), length=32, salt=None, info=b"aob-tenant-aesgcm"
+            ).derive(key))
+    
+    def encrypt(self, data: bytes) -> bytes:
+        nonce = secrets.token_bytes(self.NONCE_SIZE)
+        return self.VERSION_AESGCM + nonce + self._aead.encrypt(nonce, data, None)
+    
+    def decrypt(self, token: bytes) -> bytes:
+        if token[:1] == self.VERSION_AESGCM:
+            nonce_end = 1 + self.NONCE_SIZE
+            return self._aead.decrypt(token[1:nonce_end], token[nonce_end:], None)
+        if self._fernet is None:
+            raise ValueError("Unsupported ciphertext version")
+        # Fernet tokens start with base64 "g" (version 0x80), never 0x01
+        return self._fernet.decrypt(token)
+
+
+@dataclass(slots=True)
 class TenantConfig:
     """Tenant configuration"""
     tenant_id: str
@@ -39,6 +210,31 @@ class TenantConfig:
     metadata: Dict[str, Any]
     quotas: Dict[str, int]
     policies: List[str]
+    _cipher: Optional[TenantCipher] = field(default=None, repr=False, compare=False)
+    _cached_json: Optional[bytes] = field(default=None, repr=False, compare=False)
+    _search_path_sql: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # search_path cannot be bound as a parameter; only whitelisted names get a statement.
+        # Legacy rows may hold mixed-case names, but their schemas were created unquoted,
+        # so Postgres folded them to lower case; resolve them the same way
+        schema = self.schema_name.lower()
+        if _SCHEMA_NAME_RE.fullmatch(schema):
+            self._search_path_sql = f'SET LOCAL search_path TO "{schema}"'
+    
+    def to_json(self) -> bytes:
+        """Serialized tenant view, cached until the config changes"""
+        if self._cached_json is None:
+            self._cached_json = _dumps({
+                "tenant_id": self.tenant_id,
+                "schema_name": self.schema_name,
+                "status": self.status.value,
+                "created_at": self.created_at,
+                "metadata": self.metadata,
+                "quotas": self.quotas,
+                "policies": self.policies
+            })
+        return self._cached_json
 
 
 class TenantManager:
@@ -47,27 +243,50 @@ class TenantManager:
     def __init__(self, master_dsn: str):
         self.master_dsn = master_dsn
         self.tenants: Dict[str, TenantConfig] = {}
-        self.connections: Dict[str, asyncpg.Connection] = {}
-        self._master_conn: Optional[asyncpg.Connection] = None
+        self._master_pool: Optional[asyncpg.Pool] = None
+        
+        # Stats maintained incrementally so get_tenant_stats never scans tenants
+        self._status_counts: Counter = Counter()
+        self._policy_counts: Counter = Counter()
+        
+        master_key = os.getenv("AOB_MASTER_KEY")
+        if not master_key:
+            logger.warning("AOB_MASTER_KEY not set; tenant keys will not survive a restart")
+        self._master_fernet = Fernet(master_key or Fernet.generate_key())
+        
+        # Quota usage lives in Redis when configured (shared across replicas), else in process
+        redis_url = os.getenv("AOB_REDIS_URL")
+        self._redis = aioredis.from_url(redis_url, max_connections=100) if aioredis is not None and redis_url else None
+        self._add_usage_script = self._redis.register_script(_ADD_USAGE_LUA) if self._redis is not None else None
+        self._usage: Dict[Tuple[str, str], List[float]] = {}
         
         # KMS integration (placeholder)
         self.kms_endpoint = os.getenv("AOB_KMS_ENDPOINT", "http://localhost:9001")
-        
-        # Initialize master connection
-        asyncio.create_task(self._init_master_connection())
     
-    async def _init_master_connection(self):
-        """Initialize master database connection"""
+    async def startup(self):
+        """Open the master pool, ensure management tables and load tenants; call before serving"""
+        if self._master_pool is not None:
+            return
         try:
-            self._master_conn = await asyncpg.connect(self.master_dsn)
+            self._master_pool = await asyncpg.create_pool(
+                dsn=self.master_dsn,
+                min_size=10,
+                max_size=50,
+                max_inactive_connection_lifetime=300,
+                command_timeout=60,
+                statement_cache_size=1024,
+                init=_init_connection
+            )
             await self._create_tenant_management_tables()
             await self._load_tenant_configs()
         except Exception as e:
             logger.error(f"Failed to initialize master connection: {e}")
+            await self.close()
+            raise
     
     async def _create_tenant_management_tables(self):
         """Create tenant management tables"""
-        await self._master_conn.execute("""
+        await self._master_pool.execute("""
             CREATE TABLE IF NOT EXISTS tenants (
                 tenant_id VARCHAR(255) PRIMARY KEY,
                 schema_name VARCHAR(255) UNIQUE NOT NULL,
@@ -80,7 +299,7 @@ class TenantManager:
             );
         """)
         
-        await self._master_conn.execute("""
+        await self._master_pool.execute("""
             CREATE TABLE IF NOT EXISTS tenant_schemas (
                 schema_name VARCHAR(255) PRIMARY KEY,
                 tenant_id VARCHAR(255) REFERENCES tenants(tenant_id),
@@ -91,38 +310,51 @@ class TenantManager:
     
     async def _load_tenant_configs(self):
         """Load tenant configurations from database"""
-        rows = await self._master_conn.fetch("SELECT * FROM tenants WHERE status != 'deleted'")
-        
-        for row in rows:
-            # Decrypt encryption key (placeholder)
-            encryption_key = self._decrypt_key(row['encryption_key_encrypted'])
-            
-            tenant_config = TenantConfig(
-                tenant_id=row['tenant_id'],
-                schema_name=row['schema_name'],
-                encryption_key=encryption_key,
-                status=TenantStatus(row['status']),
-                created_at=str(row['created_at']),
-                metadata=row['metadata'] or {},
-                quotas=row['quotas'] or {},
-                policies=row['policies'] or []
-            )
-            
-            self.tenants[row['tenant_id']] = tenant_config
+        # Stream rows through a server-side cursor so memory stays bounded by one prefetch window
+        async with self._master_pool.acquire() as conn:
+            async with conn.transaction():
+                batch: List[asyncpg.Record] = []
+                async for row in conn.cursor(_LOAD_TENANTS_SQL, prefetch=_LOAD_PREFETCH):
+                    batch.append(row)
+                    if len(batch) >= _LOAD_PREFETCH:
+                        await self._load_tenant_batch(batch)
+                        batch = []
+                if batch:
+                    await self._load_tenant_batch(batch)
+    
+    async def _load_tenant_batch(self, rows: List[asyncpg.Record]):
+        """Build and register one window of tenant rows"""
+        # Key unwrapping is CPU-bound; OpenSSL releases the GIL so threads decrypt in parallel
+        configs = await asyncio.gather(*(asyncio.to_thread(self._tenant_from_row, row) for row in rows))
+        for tenant_config in configs:
+            self._track_tenant(tenant_config)
+    
+    def _tenant_from_row(self, row: asyncpg.Record) -> TenantConfig:
+        """Build tenant config from a tenants row, decrypting its key"""
+        # Decrypt encryption key (placeholder)
+        encryption_key = self._decrypt_key(row['encryption_key_encrypted'])
+        
+        return TenantConfig(
+            tenant_id=row['tenant_id'],
+            schema_name=row['schema_name'],
+            encryption_key=encryption_key,
+            status=TenantStatus(row['status']),
+            created_at=str(row['created_at']),
+            metadata=row['metadata'] or {},
+            quotas=row['quotas'] or {},
+            policies=row['policies'] or [],
+            _cipher=TenantCipher(encryption_key)
+        )
     
     def _encrypt_key(self, key: bytes) -> bytes:
         """Encrypt encryption key (placeholder implementation)"""
         # In production, this would use proper KMS
-        master_key = os.getenv("AOB_MASTER_KEY", Fernet.generate_key())
-        fernet = Fernet(master_key)
-        return fernet.encrypt(key)
+        return self._master_fernet.encrypt(key)
     
     def _decrypt_key(self, encrypted_key: bytes) -> bytes:
         """Decrypt encryption key (placeholder implementation)"""
         # In production, this would use proper KMS
-        master_key = os.getenv("AOB_MASTER_KEY", Fernet.generate_key())
-        fernet = Fernet(master_key)
-        return fernet.decrypt(encrypted_key)
+        return self._master_fernet.decrypt(encrypted_key)
     
     async def create_tenant(
         self, 
@@ -133,14 +365,45 @@ class TenantManager:
     ) -> TenantConfig:
         """Create a new tenant with isolated schema"""
         
+        tenant_config = self._new_tenant_config(tenant_id, metadata, quotas, policies)
+        encrypted_key = self._encrypt_key(tenant_config.encryption_key)
+        schema_name = tenant_config.schema_name
+        
+        # Schema DDL and both config rows commit or roll back together
+        async with self._master_pool.acquire() as conn:
+            async with conn.transaction():
+                # Serializes creates of the same id across replicas; the tenants primary key decides the winner
+                if not await conn.fetchval(_TENANT_CREATE_LOCK_SQL, tenant_id):
+                    raise TenantExistsError(f"Tenant {tenant_id} is being created")
+                await self._create_tenant_schema(conn, tenant_config)
+                try:
+                    await conn.execute(_INSERT_TENANT_SQL, tenant_id, schema_name, encrypted_key,
+                                       tenant_config.metadata, tenant_config.quotas, tenant_config.policies)
+                except asyncpg.UniqueViolationError:
+                    raise TenantExistsError(f"Tenant {tenant_id} already exists") from None
+        
+        self._track_tenant(tenant_config)
+        return tenant_config
+    
+    def _new_tenant_config(
+        self,
+        tenant_id: str,
+        metadata: Dict[str, Any] = None,
+        quotas: Dict[str, int] = None,
+        policies: List[str] = None
+    ) -> TenantConfig:
+        """Validate tenant id and build a fresh config with a new encryption key"""
+        # Fast path only; the database enforces uniqueness across replicas
         if tenant_id in self.tenants:
-            raise ValueError(f"Tenant {tenant_id} already exists")
+            raise TenantExistsError(f"Tenant {tenant_id} already exists")
         
         # Generate schema name
-        schema_name = f"tenant_{tenant_id.replace('-', '_')}"
+        schema_name = f"tenant_{tenant_id.replace('-', '_').lower()}"
+        if not _SCHEMA_NAME_RE.fullmatch(schema_name):
+            raise ValueError(f"Invalid tenant id {tenant_id!r}")
         
         # Generate encryption key
-        encryption_key = Fernet.generate_key()
+        encryption_key = secrets.token_bytes(32)
         
         # Create tenant config
         tenant_config = TenantConfig(
@@ -151,228 +414,182 @@ class TenantManager:
             created_at=str(asyncio.get_event_loop().time()),
             metadata=metadata or {},
             quotas=quotas or {},
-            policies=policies or []
+            policies=policies or [],
+            _cipher=TenantCipher(encryption_key)
         )
-        
-        # Create schema in database
-        await self._create_tenant_schema(tenant_config)
-        
-        # Store tenant config
-        encrypted_key = self._encrypt_key(encryption_key)
-        await self._master_conn.execute("""
-            INSERT INTO tenants (tenant_id, schema_name, encryption_key_encrypted, metadata, quotas, policies)
-            VALUES ($1, $2, $3, $4, $5, $6)
-        """, tenant_id, schema_name, encrypted_key, json.dumps(metadata or {}), json.dumps(quotas or {}), json.dumps(policies or []))
-        
-        await self._master_conn.execute("""
-            INSERT INTO tenant_schemas (schema_name, tenant_id)
-            VALUES ($1, $2)
-        """, schema_name, tenant_id)
-        
-        self.tenants[tenant_id] = tenant_config
         return tenant_config
     
-    async def _create_tenant_schema(self, tenant_config: TenantConfig):
-        """Create isolated schema for tenant"""
-        schema_name = tenant_config.schema_name
-        
-        # Create schema
-        await self._master_conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema_name}")
-        
-        # Create tenant-specific tables
-        await self._master_conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {schema_name}.events (
-                id BIGSERIAL PRIMARY KEY,
-                correlation_id VARCHAR(255) NOT NULL,
-                event_type VARCHAR(100) NOT NULL,
-                payload JSONB NOT NULL,
-                timestamp TIMESTAMP DEFAULT NOW(),
-                causation_id VARCHAR(255),
-                idempotency_key VARCHAR(255)
-            );
-        """)
-        
-        await self._master_conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {schema_name}.snapshots (
-                id BIGSERIAL PRIMARY KEY,
-                correlation_id VARCHAR(255) NOT NULL,
-                snapshot_id VARCHAR(255) UNIQUE NOT NULL,
-                state JSONB NOT NULL,
-                created_at TIMESTAMP DEFAULT NOW(),
-                checksum VARCHAR(64)
-            );
-        """)
-        
-        await self._master_conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {schema_name}.sessions (
-                id BIGSERIAL PRIMARY KEY,
-                session_id VARCHAR(255) UNIQUE NOT NULL,
-                correlation_id VARCHAR(255),
-                status VARCHAR(50) DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT NOW(),
-                last_accessed TIMESTAMP DEFAULT NOW(),
-                metadata JSONB DEFAULT '{{}}'
-            );
-        """)
-        
-        await self._master_conn.execute(f"""
-            CREATE TABLE IF NOT EXISTS {schema_name}.outbox (
-                id BIGSERIAL PRIMARY KEY,
-                event_id BIGINT REFERENCES {schema_name}.events(id),
-                topic VARCHAR(255) NOT NULL,
-                payload JSONB NOT NULL,
-                created_at TIMESTAMP DEFAULT NOW(),
-                delivered_at TIMESTAMP,
-                retry_count INTEGER DEFAULT 0
-            );
-        """)
-        
-        # Create indexes
-        await self._master_conn.execute(f"""
-            CREATE INDEX IF NOT EXISTS idx_{schema_name}_events_correlation 
-            ON {schema_name}.events(correlation_id);
-        """)
-        
-        await self._master_conn.execute(f"""
-            CREATE INDEX IF NOT EXISTS idx_{schema_name}_snapshots_correlation 
-            ON {schema_name}.snapshots(correlation_id);
-        """)
-        
-        await self._master_conn.execute(f"""
-            CREATE INDEX IF NOT EXISTS idx_{schema_name}_outbox_undelivered 
-            ON {schema_name}.outbox(delivered_at) WHERE delivered_at IS NULL;
-        """)
-        
-        # Grant permissions (placeholder - would be more sophisticated in production)
-        await self._master_conn.execute(f"""
-            GRANT USAGE ON SCHEMA {schema_name} TO aob_user;
-            GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA {schema_name} TO aob_user;
-            GRANT ALL PRIVILEGES ON ALL SEQUENCES IN SCHEMA {schema_name} TO aob_user;
-        """)
+    async def create_tenants_bulk(self, configs: List[Dict[str, Any]]) -> List[TenantConfig]:
+        """Provision many tenants with batched DDL and COPY for the config rows"""
+        tenant_ids = [c["tenant_id"] for c in configs]
+        if len(set(tenant_ids)) != len(tenant_ids):
+            raise ValueError("Duplicate tenant ids in bulk request")
+        
+        tenant_configs = [
+            self._new_tenant_config(c["tenant_id"], c.get("metadata"), c.get("quotas"), c.get("policies"))
+            for c in configs
+        ]
+        
+        # One transaction per chunk: a single transaction for every schema would exhaust
+        # max_locks_per_transaction, and each committed chunk is a complete set of tenants
+        async with self._master_pool.acquire() as conn:
+            for i in range(0, len(tenant_configs), _DDL_BATCH_SCHEMAS):
+                chunk = tenant_configs[i:i + _DDL_BATCH_SCHEMAS]
+                async with conn.transaction():
+                    await conn.execute("".join(_TENANT_SCHEMA_DDL.format(schema=t.schema_name) for t in chunk))
+                    try:
+                        await conn.copy_records_to_table(
+                            "tenants",
+                            records=[
+                                (t.tenant_id, t.schema_name, self._encrypt_key(t.encryption_key), t.metadata, t.quotas, t.policies)
+                                for t in chunk
+                            ],
+                            columns=["tenant_id", "schema_name", "encryption_key_encrypted", "metadata", "quotas", "policies"]
+                        )
+                    except asyncpg.UniqueViolationError as e:
+                        raise TenantExistsError(e.detail or str(e)) from None
+                    await conn.copy_records_to_table(
+                        "tenant_schemas",
+                        records=[(t.schema_name, t.tenant_id) for t in chunk],
+                        columns=["schema_name", "tenant_id"]
+                    )
+                for tenant_config in chunk:
+                    self._track_tenant(tenant_config)
+        
+        return tenant_configs
+    
+    def _track_tenant(self, tenant_config: TenantConfig):
+        """Register tenant in memory and in the stats counters"""
+        self.tenants[tenant_config.tenant_id] = tenant_config
+        self._status_counts[tenant_config.status] += 1
+        self._policy_counts.update(tenant_config.policies)
     
-    async def get_tenant_connection(self, tenant_id: str) -> asyncpg.Connection:
-        """Get database connection for specific tenant"""
-        if tenant_id not in self.tenants:
+    async def _create_tenant_schema(self, conn: asyncpg.Connection, tenant_config: TenantConfig):
+        """Create isolated schema for tenant in a single simple-query round-trip"""
+        await conn.execute(_TENANT_SCHEMA_DDL.format(schema=tenant_config.schema_name))
+    
+    @asynccontextmanager
+    async def acquire(self, tenant_id: str) -> AsyncIterator[asyncpg.Connection]:
+        """Check out a shared pool connection scoped to the tenant schema for one transaction"""
+        tenant_config = self.tenants.get(tenant_id)
+        if tenant_config is None:
             raise ValueError(f"Tenant {tenant_id} not found")
         
-        tenant_config = self.tenants[tenant_id]
-        
-        if tenant_id in self.connections:
-            return self.connections[tenant_id]
-        
-        # Create tenant-specific connection
-        tenant_dsn = self.master_dsn.replace('/aob', f'/aob?options=-csearch_path={tenant_config.schema_name}')
-        conn = await asyncpg.connect(tenant_dsn)
-        
-        # Set search path to tenant schema
-        await conn.execute(f"SET search_path TO {tenant_config.schema_name}")
+        search_path_sql = tenant_config._search_path_sql
+        if search_path_sql is None:
+            raise ValueError(f"Invalid schema name {tenant_config.schema_name!r}")
         
-        self.connections[tenant_id] = conn
-        return conn
+        async with self._master_pool.acquire() as conn:
+            async with conn.transaction():
+                # SET LOCAL resets on commit/rollback, so pooled connections never leak a tenant's path
+                await conn.execute(search_path_sql)
+                yield conn
     
     async def encrypt_tenant_data(self, tenant_id: str, data: bytes) -> bytes:
         """Encrypt data using tenant-specific key"""
-        if tenant_id not in self.tenants:
+        tenant_config = self.tenants.get(tenant_id)
+        if tenant_config is None:
             raise ValueError(f"Tenant {tenant_id} not found")
         
-        tenant_config = self.tenants[tenant_id]
-        fernet = Fernet(tenant_config.encryption_key)
-        return fernet.encrypt(data)
+        return tenant_config._cipher.encrypt(data)
     
     async def decrypt_tenant_data(self, tenant_id: str, encrypted_data: bytes) -> bytes:
         """Decrypt data using tenant-specific key"""
-        if tenant_id not in self.tenants:
+        tenant_config = self.tenants.get(tenant_id)
+        if tenant_config is None:
             raise ValueError(f"Tenant {tenant_id} not found")
         
-        tenant_config = self.tenants[tenant_id]
-        fernet = Fernet(tenant_config.encryption_key)
-        return fernet.decrypt(encrypted_data)
+        return tenant_config._cipher.decrypt(encrypted_data)
     
     async def check_tenant_quota(self, tenant_id: str, resource: str, amount: int = 1) -> bool:
-        """Check if tenant has quota for resource"""
-        if tenant_id not in self.tenants:
+        """Reserve quota for resource; returns False (reserving nothing) if it would exceed the limit"""
+        tenant_config = self.tenants.get(tenant_id)
+        if tenant_config is None:
             return False
         
-        tenant_config = self.tenants[tenant_id]
-        
-        if resource not in tenant_config.quotas:
+        quota_limit = tenant_config.quotas.get(resource)
+        if quota_limit is None:
             return True  # No quota limit
         
-        # Check current usage (placeholder - would query actual usage)
-        current_usage = await self._get_tenant_usage(tenant_id, resource)
-        quota_limit = tenant_config.quotas[resource]
-        
-        return current_usage + amount <= quota_limit
+        if await self._add_usage(tenant_id, resource, amount) > quota_limit:
+            await self._add_usage(tenant_id, resource, -amount)
+            return False
+        return True
+    
+    async def release_tenant_quota(self, tenant_id: str, resource: str, amount: int = 1):
+        """Return quota reserved by check_tenant_quota when the gated work is rolled back"""
+        await self._add_usage(tenant_id, resource, -amount)
     
     async def _get_tenant_usage(self, tenant_id: str, resource: str) -> int:
-        """Get current usage for tenant resource (placeholder)"""
-        # In production, this would query actual usage metrics
-        return 0
+        """Get current usage for tenant resource in the active window"""
+        return await self._add_usage(tenant_id, resource, 0)
+    
+    async def _add_usage(self, tenant_id: str, resource: str, amount: int) -> int:
+        """Adjust the windowed usage counter and return the new value"""
+        if self._redis is not None:
+            used = await self._add_usage_script(keys=[f"q:{tenant_id}:{resource}"], args=[amount, QUOTA_WINDOW_S])
+            return int(used)
+        
+        # No await between read and write, so the event loop makes this update atomic
+        now = asyncio.get_running_loop().time()
+        entry = self._usage.get((tenant_id, resource))
+        if entry is None or now - entry[0] >= QUOTA_WINDOW_S:
+            entry = self._usage[(tenant_id, resource)] = [now, 0]
+        entry[1] = max(0, entry[1] + amount)
+        return int(entry[1])
     
     async def suspend_tenant(self, tenant_id: str) -> bool:
         """Suspend tenant access"""
-        if tenant_id not in self.tenants:
+        tenant_config = self.tenants.get(tenant_id)
+        if tenant_config is None:
             return False
         
-        tenant_config = self.tenants[tenant_id]
+        self._status_counts[tenant_config.status] -= 1
+        self._status_counts[TenantStatus.SUSPENDED] += 1
         tenant_config.status = TenantStatus.SUSPENDED
+        tenant_config._cached_json = None
         
-        await self._master_conn.execute("""
-            UPDATE tenants SET status = 'suspended' WHERE tenant_id = $1
-        """, tenant_id)
+        await self._master_pool.execute(_UPDATE_STATUS_SQL, tenant_id, TenantStatus.SUSPENDED.value)
         
         return True
     
     async def delete_tenant(self, tenant_id: str) -> bool:
         """Delete tenant and all data"""
-        if tenant_id not in self.tenants:
+        tenant_config = self.tenants.get(tenant_id)
+        if tenant_config is None:
             return False
         
-        tenant_config = self.tenants[tenant_id]
-        
         # Mark as deleted
+        self._status_counts[tenant_config.status] -= 1
         tenant_config.status = TenantStatus.DELETED
+        tenant_config._cached_json = None
         
-        await self._master_conn.execute("""
-            UPDATE tenants SET status = 'deleted' WHERE tenant_id = $1
-        """, tenant_id)
-        
-        # Close connection
-        if tenant_id in self.connections:
-            await self.connections[tenant_id].close()
-            del self.connections[tenant_id]
+        await self._master_pool.execute(_UPDATE_STATUS_SQL, tenant_id, TenantStatus.DELETED.value)
         
         # Remove from memory
         del self.tenants[tenant_id]
+        self._policy_counts.subtract(tenant_config.policies)
         
         return True
     
     async def get_tenant_stats(self) -> Dict[str, Any]:
         """Get tenant statistics"""
-        stats = {
+        return {
             "total_tenants": len(self.tenants),
-            "active_tenants": sum(1 for t in self.tenants.values() if t.status == TenantStatus.ACTIVE),
-            "suspended_tenants": sum(1 for t in self.tenants.values() if t.status == TenantStatus.SUSPENDED),
-            "tenants_by_policy": {},
-            "total_schemas": len(set(t.schema_name for t in self.tenants.values()))
+            "active_tenants": self._status_counts[TenantStatus.ACTIVE],
+            "suspended_tenants": self._status_counts[TenantStatus.SUSPENDED],
+            "tenants_by_policy": {p: n for p, n in self._policy_counts.items() if n > 0},
+            "total_schemas": len(self.tenants)  # schema_name is unique per tenant
         }
-        
-        # Group by policies
-        for tenant in self.tenants.values():
-            for policy in tenant.policies:
-                if policy not in stats["tenants_by_policy"]:
-                    stats["tenants_by_policy"][policy] = 0
-                stats["tenants_by_policy"][policy] += 1
-        
-        return stats
     
     async def close(self):
-        """Close all connections"""
-        for conn in self.connections.values():
-            await conn.close()
+        """Close the shared connection pool and quota store"""
+        if self._master_pool:
+            await self._master_pool.close()
+            self._master_pool = None
         
-        if self._master_conn:
-            await self._master_conn.close()
+        if self._redis is not None:
+            await self._redis.aclose()
 
 
 # Global instance
@@ -382,8 +599,31 @@ tenant_manager = TenantManager(os.getenv("AOB_POSTGRES_DSN", "postgres://postgre
 # FastAPI integration
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+
+
+class _FastJSONResponse(JSONResponse):
+    """JSON responses rendered with orjson when it is installed"""
+    
+    def render(self, content: Any) -> bytes:
+        return _dumps(content)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the tenant manager before serving and close its pool on shutdown"""
+    await tenant_manager.startup()
+    try:
+        yield
+    finally:
+        await tenant_manager.close()
 
-app = FastAPI(title="Multi-tenant Database Manager")
+
+app = FastAPI(
+    title="Multi-tenant Database Manager",
+    lifespan=lifespan,
+    default_response_class=_FastJSONResponse
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -419,26 +659,32 @@ async def create_tenant(
             "status": tenant_config.status.value,
             "created_at": tenant_config.created_at
         }
+    except TenantExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/tenants/bulk")
+async def create_tenants_bulk(tenants: List[Dict[str, Any]]):
+    """Create many tenants at once"""
+    try:
+        tenant_configs = await tenant_manager.create_tenants_bulk(tenants)
+    except TenantExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"created": [t.tenant_id for t in tenant_configs]}
+
+
 @app.get("/tenants/{tenant_id}")
 async def get_tenant(tenant_id: str):
     """Get tenant information"""
-    if tenant_id not in tenant_manager.tenants:
+    tenant_config = tenant_manager.tenants.get(tenant_id)
+    if tenant_config is None:
         raise HTTPException(status_code=404, detail="Tenant not found")
     
-    tenant_config = tenant_manager.tenants[tenant_id]
-    return {
-        "tenant_id": tenant_config.tenant_id,
-        "schema_name": tenant_config.schema_name,
-        "status": tenant_config.status.value,
-        "created_at": tenant_config.created_at,
-        "metadata": tenant_config.metadata,
-        "quotas": tenant_config.quotas,
-        "policies": tenant_config.policies
-    }
+    return Response(content=tenant_config.to_json(), media_type="application/json")
 
 
 @app.post("/tenants/{tenant_id}/suspend")
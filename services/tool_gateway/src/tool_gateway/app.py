@@ -8,17 +8,76 @@ from __future__ import annotations
 import asyncio
 import json
 import time
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+from urllib.parse import urljoin
+from typing import Callable, Dict, List, Optional, Any, Union
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import httpx
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 import logging
-from collections import defaultdict, deque
+import os
+from collections import Counter, OrderedDict, defaultdict, deque
 import jsonschema
 
+try:
+    import fastjsonschema
+except Exception:  # pragma: no cover
+    fastjsonschema = None  # type: ignore
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import msgspec
+except Exception:  # pragma: no cover
+    msgspec = None  # type: ignore
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2)
+except Exception:  # pragma: no cover
+    h2 = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+def _dumps(value: Any) -> bytes:
+    if orjson is None:
+        return json.dumps(value).encode()
+    return orjson.dumps(value)
+
+
+def _canonical(value: Any) -> bytes:
+    """Key-order independent JSON, for cache keys"""
+    if orjson is None:
+        return json.dumps(value, sort_keys=True).encode()
+    return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+
+
+def _loads(content: bytes) -> Any:
+    if orjson is None:
+        return json.loads(content)
+    return orjson.loads(content)
+
+
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Upstream connection pool shared by tool calls, policy checks and health probes
+TOOL_MAX_CONNECTIONS = int(os.getenv("AOB_TOOL_MAX_CONN", "500"))
+TOOL_MAX_KEEPALIVE = int(os.getenv("AOB_TOOL_MAX_KEEPALIVE", "100"))
+TOOL_KEEPALIVE_EXPIRY_S = 30.0
+
+# OPA micro-batching: concurrent policy checks are coalesced into one Batch Query request
+OPA_BATCH_MAX = 64
+OPA_BATCH_WAIT_S = 0.005
+
+# Tool calls use health status at most this old; a background task refreshes it
+HEALTH_TTL_S = float(os.getenv("AOB_HEALTH_TTL", "10"))
+
+# OPA allow decisions are reused for identical calls within this window (LRU-bounded); 0 disables
+POLICY_CACHE_TTL_S = float(os.getenv("AOB_POLICY_CACHE_TTL", "2"))
+POLICY_CACHE_MAX = 4096
+
 
 class ToolStatus(Enum):
     """Tool availability status"""
@@ -28,7 +87,7 @@ class ToolStatus(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolContract:
     """Tool contract definition"""
     name: str
@@ -41,11 +100,12 @@ class ToolContract:
     rate_limit_per_minute: int = 60
     requires_auth: bool = False
     auth_type: Optional[str] = None  # "bearer", "api_key", "oauth2"
-    scopes: List[str] = None
-    tags: List[str] = None
+    scopes: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    health_endpoint: Optional[str] = None  # defaults to /health on the endpoint's host
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     """Tool call request"""
     tool_name: str
@@ -56,7 +116,7 @@ class ToolCall:
     metadata: Dict[str, Any] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolResponse:
     """Tool call response"""
     success: bool
@@ -64,32 +124,44 @@ class ToolResponse:
     error: Optional[str] = None
     latency_ms: float = 0.0
     tool_used: str = ""
-    warnings: List[str] = None
+    warnings: List[str] = field(default_factory=list)
+
+
+def _bearer_auth(headers: Dict[str, str], metadata: Dict[str, Any]) -> None:
+    headers["Authorization"] = f"Bearer {metadata.get('auth_token', '')}"
+
+
+def _api_key_auth(headers: Dict[str, str], metadata: Dict[str, Any]) -> None:
+    headers["X-API-Key"] = metadata.get('api_key', '')
+
+
+# auth_type -> function that adds the call's credentials to the outgoing headers
+_AUTH_HANDLERS: Dict[str, Callable[[Dict[str, str], Dict[str, Any]], None]] = {
+    "bearer": _bearer_auth,
+    "api_key": _api_key_auth,
+}
 
 
 class RateLimiter:
-    """Token bucket rate limiter"""
+    """Token bucket rate limiter (event-loop confined; no await, so updates are atomic)"""
     
     def __init__(self, capacity: int, refill_rate: float):
         self.capacity = capacity
         self.refill_rate = refill_rate
         self.tokens = capacity
-        self.last_refill = time.time()
-        self.lock = asyncio.Lock()
+        self.last_refill = time.monotonic()
     
-    async def acquire(self, tokens: int = 1) -> bool:
+    def acquire(self, tokens: int = 1) -> bool:
         """Try to acquire tokens"""
-        async with self.lock:
-            now = time.time()
-            # Refill tokens based on time elapsed
-            elapsed = now - self.last_refill
-            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
-            self.last_refill = now
-            
-            if self.tokens >= tokens:
-                self.tokens -= tokens
-                return True
-            return False
+        now = time.monotonic()
+        # Refill tokens based on time elapsed
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+        
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
 
 
 class ToolGateway:
@@ -100,10 +172,36 @@ class ToolGateway:
         self.rate_limiters: Dict[str, RateLimiter] = {}
         self.circuit_breakers: Dict[str, Dict[str, Any]] = {}
         self.health_status: Dict[str, ToolStatus] = {}
-        self._client = httpx.AsyncClient(timeout=30.0)
+        self._validators: Dict[str, Any] = {}
+        self._compiled: Dict[str, Callable[[Any], Any]] = {}
+        self._health_urls: Dict[str, str] = {}
+        self._auth_fns: Dict[str, Optional[Callable[[Dict[str, str], Dict[str, Any]], None]]] = {}
+        self._tool_dicts: Dict[str, Dict[str, Any]] = {}
+        self._tools_json: Optional[bytes] = None
+        self._client = httpx.AsyncClient(
+            http2=h2 is not None,
+            limits=httpx.Limits(
+                max_connections=TOOL_MAX_CONNECTIONS,
+                max_keepalive_connections=TOOL_MAX_KEEPALIVE,
+                keepalive_expiry=TOOL_KEEPALIVE_EXPIRY_S
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0)
+        )
         
         # OPA policy evaluator
-        self.opa_endpoint = "http://localhost:8181/v1/data/aob/tool_allow"
+        opa_base = os.getenv("AOB_OPA_URL", "http://localhost:8181").rstrip("/")
+        self.opa_endpoint = f"{opa_base}/v1/data/aob/tool_allow"
+        self.opa_batch_endpoint = self.opa_endpoint.replace("/v1/data/", "/v1/batch/data/", 1)
+        self._opa_batch_supported = True
+        self._opa_queue: asyncio.Queue = asyncio.Queue()
+        self._opa_batcher: Optional[asyncio.Task] = None
+        self._opa_inflight: set = set()
+        self._policy_cache: OrderedDict = OrderedDict()
+        
+        # Last health probe per tool (monotonic seconds) and probes currently running
+        self._health_checked_at: Dict[str, float] = {}
+        self._health_probes: Dict[str, asyncio.Task] = {}
+        self._health_refresher: Optional[asyncio.Task] = None
         
         # Initialize default tools
         self._setup_default_tools()
@@ -172,33 +270,145 @@ class ToolGateway:
             tags=["files", "internal"]
         )
         
-        # Initialize rate limiters
-        for tool_name, tool in self.tools.items():
-            self.rate_limiters[tool_name] = RateLimiter(
-                capacity=tool.rate_limit_per_minute,
-                refill_rate=tool.rate_limit_per_minute / 60.0
-            )
-            
-            self.health_status[tool_name] = ToolStatus.UNKNOWN
+        # Initialize rate limiters, validators and health URLs
+        for tool in list(self.tools.values()):
+            self._index_tool(tool)
+    
+    def _index_tool(self, tool: ToolContract):
+        """Add tool and everything derived from its contract; raises before mutating if the schema is invalid"""
+        validator = self._compile_validator(tool)
+        self.tools[tool.name] = tool
+        self._validators[tool.name] = validator
+        self._set_compiled(tool)
+        self.rate_limiters[tool.name] = RateLimiter(
+            capacity=tool.rate_limit_per_minute,
+            refill_rate=tool.rate_limit_per_minute / 60.0
+        )
+        self.health_status[tool.name] = ToolStatus.UNKNOWN
+        self._health_urls[tool.name] = tool.health_endpoint or urljoin(tool.endpoint, "/health")
+        self._auth_fns[tool.name] = _AUTH_HANDLERS.get(tool.auth_type) if tool.requires_auth else None
+        self._tool_dicts[tool.name] = asdict(tool)
+        self._tools_json = None
+    
+    def tools_json(self) -> bytes:
+        """GET /tools body; the contracts part is serialized once per registration change"""
+        if self._tools_json is None:
+            self._tools_json = _dumps(self._tool_dicts)
+        health = _dumps({name: status.value for name, status in self.health_status.items()})
+        return b'{"tools":' + self._tools_json + b',"health_status":' + health + b'}'
+    
+    def _compile_validator(self, tool: ToolContract):
+        """Build a reusable validator for the tool schema; raises SchemaError if the schema is invalid"""
+        validator_cls = jsonschema.validators.validator_for(tool.schema)
+        validator_cls.check_schema(tool.schema)
+        return validator_cls(tool.schema)
+    
+    def _set_compiled(self, tool: ToolContract):
+        """Generate a specialized validation function for the tool schema when fastjsonschema supports it"""
+        self._compiled.pop(tool.name, None)
+        if fastjsonschema is None:
+            return
+        try:
+            # use_default=False: validation must not inject schema defaults into the forwarded parameters
+            self._compiled[tool.name] = fastjsonschema.compile(tool.schema, use_default=False)
+        except Exception as e:
+            logger.info(f"Tool {tool.name} schema not compilable, using jsonschema: {e}")
+    
+    async def start(self):
+        """Start OPA batching and periodic health refresh; without them checks run inline"""
+        if self._opa_batcher is None:
+            self._opa_batcher = asyncio.create_task(self._run_opa_batcher())
+        if self._health_refresher is None:
+            self._health_refresher = asyncio.create_task(self._run_health_refresher())
+    
+    async def _run_health_refresher(self):
+        """Probe every tool each HEALTH_TTL_S so call_tool reads fresh cached status"""
+        while True:
+            await asyncio.gather(*(self.health_check(name) for name in list(self.tools)))
+            await asyncio.sleep(HEALTH_TTL_S)
+    
+    def _cached_health(self, tool_name: str) -> ToolStatus:
+        """Last known status; schedules a background probe when it is older than HEALTH_TTL_S"""
+        checked_at = self._health_checked_at.get(tool_name)
+        if checked_at is None or time.monotonic() - checked_at >= HEALTH_TTL_S:
+            self._health_probe(tool_name)
+        return self.health_status.get(tool_name, ToolStatus.UNKNOWN)
+    
+    def _health_probe(self, tool_name: str) -> asyncio.Task:
+        """Single in-flight health probe per tool, shared by every caller"""
+        task = self._health_probes.get(tool_name)
+        if task is None:
+            task = self._health_probes[tool_name] = asyncio.create_task(self.health_check(tool_name))
+            task.add_done_callback(lambda _: self._health_probes.pop(tool_name, None))
+        return task
+    
+    @staticmethod
+    def _policy_key(tool_call: ToolCall) -> tuple:
+        return (
+            tool_call.tenant_id,
+            tool_call.user_id,
+            tool_call.tool_name,
+            _canonical(tool_call.parameters),
+            _canonical(tool_call.metadata) if tool_call.metadata else b""
+        )
+    
+    def _cached_policy(self, key: tuple) -> bool:
+        """True if an identical call was allowed within POLICY_CACHE_TTL_S"""
+        expires_at = self._policy_cache.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._policy_cache[key]
+            return False
+        self._policy_cache.move_to_end(key)
+        return True
     
     async def check_policy(self, tool_call: ToolCall) -> bool:
-        """Check OPA policy for tool call"""
+        """Check OPA policy for tool call (allow decisions are cached briefly)"""
+        if POLICY_CACHE_TTL_S <= 0:
+            return await self._evaluate_policy(tool_call)
+        
+        key = self._policy_key(tool_call)
+        if self._cached_policy(key):
+            return True
+        
+        allowed = await self._evaluate_policy(tool_call)
+        # Only allows are cached: denials and OPA errors are re-evaluated on the next call
+        if allowed:
+            self._policy_cache[key] = time.monotonic() + POLICY_CACHE_TTL_S
+            self._policy_cache.move_to_end(key)
+            if len(self._policy_cache) > POLICY_CACHE_MAX:
+                self._policy_cache.popitem(last=False)
+        return allowed
+    
+    async def _evaluate_policy(self, tool_call: ToolCall) -> bool:
+        """Ask OPA, through the batcher when it is running"""
+        policy_input = {
+            "tool_name": tool_call.tool_name,
+            "tenant_id": tool_call.tenant_id,
+            "user_id": tool_call.user_id,
+            "parameters": tool_call.parameters,
+            "metadata": tool_call.metadata or {}
+        }
+        
+        if self._opa_batcher is None or not self._opa_batch_supported:
+            return await self._check_policy_single(policy_input)
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._opa_queue.put((policy_input, future))
+        return await future
+    
+    async def _check_policy_single(self, policy_input: Dict[str, Any]) -> bool:
+        """Evaluate one policy input against the OPA data API"""
         try:
-            policy_input = {
-                "tool_name": tool_call.tool_name,
-                "tenant_id": tool_call.tenant_id,
-                "user_id": tool_call.user_id,
-                "parameters": tool_call.parameters,
-                "metadata": tool_call.metadata or {}
-            }
-            
             response = await self._client.post(
                 self.opa_endpoint,
-                json={"input": policy_input}
+                content=_dumps({"input": policy_input}),
+                headers=_JSON_HEADERS
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = _loads(response.content)
                 return result.get("result", False)
             else:
                 logger.warning(f"OPA policy check failed: {response.status_code}")
@@ -208,33 +418,89 @@ class ToolGateway:
             logger.error(f"Policy check error: {e}")
             return False
     
+    async def _run_opa_batcher(self):
+        """Drain queued policy checks every OPA_BATCH_WAIT_S or OPA_BATCH_MAX inputs"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._opa_queue.get()]
+            deadline = loop.time() + OPA_BATCH_WAIT_S
+            while len(batch) < OPA_BATCH_MAX:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._opa_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Evaluate in the background so the next window keeps filling
+            task = asyncio.create_task(self._evaluate_policy_batch(batch))
+            self._opa_inflight.add(task)
+            task.add_done_callback(self._opa_inflight.discard)
+    
+    async def _evaluate_policy_batch(self, batch: List[Any]):
+        """Resolve a window of policy checks with one OPA Batch Query request"""
+        if len(batch) == 1 or not self._opa_batch_supported:
+            results = await asyncio.gather(*(self._check_policy_single(policy_input) for policy_input, _ in batch))
+        else:
+            results = await self._query_policy_batch([policy_input for policy_input, _ in batch])
+        
+        for (_, future), allowed in zip(batch, results):
+            if not future.done():
+                future.set_result(allowed)
+    
+    async def _query_policy_batch(self, inputs: List[Dict[str, Any]]) -> List[bool]:
+        try:
+            response = await self._client.post(
+                self.opa_batch_endpoint,
+                content=_dumps({"inputs": {str(i): policy_input for i, policy_input in enumerate(inputs)}}),
+                headers=_JSON_HEADERS
+            )
+            
+            if response.status_code == 404:
+                # OPA builds without the Batch Query API: fall back to per-input queries for good
+                logger.info("OPA batch endpoint unavailable, using single queries")
+                self._opa_batch_supported = False
+                return list(await asyncio.gather(*(self._check_policy_single(i) for i in inputs)))
+            
+            if response.status_code == 200:
+                responses = _loads(response.content).get("responses", {})
+                return [responses.get(str(i), {}).get("result", False) for i in range(len(inputs))]
+            
+            logger.warning(f"OPA batch policy check failed: {response.status_code}")
+            
+        except Exception as e:
+            logger.error(f"Batch policy check error: {e}")
+        
+        return [False] * len(inputs)
+    
     def validate_schema(self, tool_name: str, parameters: Dict[str, Any]) -> List[str]:
         """Validate parameters against tool schema"""
-        if tool_name not in self.tools:
+        validator = self._validators.get(tool_name)
+        if validator is None:
             return [f"Unknown tool: {tool_name}"]
         
-        tool = self.tools[tool_name]
-        errors = []
+        compiled = self._compiled.get(tool_name)
+        if compiled is not None:
+            try:
+                compiled(parameters)
+                return []
+            except fastjsonschema.JsonSchemaException:
+                pass  # Rejections are rare; let jsonschema report every error below
         
         try:
-            jsonschema.validate(parameters, tool.schema)
-        except ValidationError as e:
-            errors.append(f"Schema validation failed: {e.message}")
+            return [f"Schema validation failed: {e.message}" for e in validator.iter_errors(parameters)]
         except Exception as e:
-            errors.append(f"Schema validation error: {str(e)}")
-        
-        return errors
+            return [f"Schema validation error: {str(e)}"]
     
     async def health_check(self, tool_name: str) -> ToolStatus:
         """Check tool health status"""
-        if tool_name not in self.tools:
+        health_url = self._health_urls.get(tool_name)
+        if health_url is None:
             return ToolStatus.UNKNOWN
         
-        tool = self.tools[tool_name]
-        
         try:
             # Simple health check
-            health_url = tool.endpoint.replace("/query", "/health").replace("/weather", "/health")
             response = await self._client.get(health_url, timeout=5.0)
             
             if response.status_code == 200:
@@ -250,6 +516,7 @@ class ToolGateway:
             status = ToolStatus.UNHEALTHY
         
         self.health_status[tool_name] = status
+        self._health_checked_at[tool_name] = time.monotonic()
         return status
     
     async def call_tool(self, tool_call: ToolCall) -> ToolResponse:
@@ -267,8 +534,9 @@ class ToolGateway:
         
         tool = self.tools[tool_call.tool_name]
         
-        # Check health status
-        health_status = await self.health_check(tool_call.tool_name)
+        # Check health status (cached; never waits on an upstream probe)
+        never_probed = tool_call.tool_name not in self._health_checked_at
+        health_status = ToolStatus.UNKNOWN if never_probed else self._cached_health(tool_call.tool_name)
         if health_status == ToolStatus.UNHEALTHY:
             return ToolResponse(
                 success=False,
@@ -279,7 +547,7 @@ class ToolGateway:
         
         # Check rate limit
         rate_limiter = self.rate_limiters[tool_call.tool_name]
-        if not await rate_limiter.acquire():
+        if not rate_limiter.acquire():
             return ToolResponse(
                 success=False,
                 error="Rate limit exceeded",
@@ -297,8 +565,23 @@ class ToolGateway:
                 latency_ms=(time.time() - start_time) * 1000
             )
         
-        # Check OPA policy
-        if not await self.check_policy(tool_call):
+        # Check OPA policy; a tool's first health probe runs alongside it instead of before it
+        if never_probed:
+            allowed, health_status = await asyncio.gather(
+                self.check_policy(tool_call),
+                asyncio.shield(self._health_probe(tool_call.tool_name))
+            )
+            if health_status == ToolStatus.UNHEALTHY:
+                return ToolResponse(
+                    success=False,
+                    error="Tool is currently unhealthy",
+                    tool_used=tool_call.tool_name,
+                    latency_ms=(time.time() - start_time) * 1000
+                )
+        else:
+            allowed = await self.check_policy(tool_call)
+        
+        if not allowed:
             return ToolResponse(
                 success=False,
                 error="Policy check failed",
@@ -308,14 +591,13 @@ class ToolGateway:
         
         # Execute tool call
         try:
-            headers = tool.headers or {}
+            # Copy so per-call auth headers never leak into the shared contract
+            headers = dict(tool.headers) if tool.headers else {}
             
-            # Add authentication if required
-            if tool.requires_auth:
-                if tool.auth_type == "bearer":
-                    headers["Authorization"] = f"Bearer {tool_call.metadata.get('auth_token', '')}"
-                elif tool.auth_type == "api_key":
-                    headers["X-API-Key"] = tool_call.metadata.get('api_key', '')
+            # Add authentication if required (handler resolved at registration)
+            auth_fn = self._auth_fns[tool_call.tool_name]
+            if auth_fn is not None:
+                auth_fn(headers, tool_call.metadata or {})
             
             # Prepare request
             if tool.method == "GET":
@@ -328,13 +610,13 @@ class ToolGateway:
             else:
                 response = await self._client.post(
                     tool.endpoint,
-                    json=tool_call.parameters,
-                    headers=headers,
+                    content=_dumps(tool_call.parameters),
+                    headers={**_JSON_HEADERS, **headers},
                     timeout=tool.timeout_ms / 1000.0
                 )
             
             response.raise_for_status()
-            result = response.json()
+            result = _loads(response.content)
             
             latency_ms = (time.time() - start_time) * 1000
             
@@ -370,12 +652,7 @@ class ToolGateway:
     async def register_tool(self, tool: ToolContract) -> bool:
         """Register a new tool"""
         try:
-            self.tools[tool.name] = tool
-            self.rate_limiters[tool.name] = RateLimiter(
-                capacity=tool.rate_limit_per_minute,
-                refill_rate=tool.rate_limit_per_minute / 60.0
-            )
-            self.health_status[tool.name] = ToolStatus.UNKNOWN
+            self._index_tool(tool)
             return True
         except Exception as e:
             logger.error(f"Failed to register tool {tool.name}: {e}")
@@ -383,43 +660,56 @@ class ToolGateway:
     
     async def get_tool_stats(self) -> Dict[str, Any]:
         """Get tool gateway statistics"""
-        stats = {
+        status_counts = Counter(status.value for status in self.health_status.values())
+        tag_counts = Counter(tag for tool in self.tools.values() for tag in tool.tags)
+        return {
             "total_tools": len(self.tools),
-            "healthy_tools": sum(1 for status in self.health_status.values() if status == ToolStatus.HEALTHY),
-            "tools_by_status": {},
-            "tools_by_tag": {}
+            "healthy_tools": status_counts.get(ToolStatus.HEALTHY.value, 0),
+            "tools_by_status": dict(status_counts),
+            "tools_by_tag": dict(tag_counts)
         }
-        
-        # Group by status
-        for status in self.health_status.values():
-            status_name = status.value
-            if status_name not in stats["tools_by_status"]:
-                stats["tools_by_status"][status_name] = 0
-            stats["tools_by_status"][status_name] += 1
-        
-        # Group by tags
-        for tool in self.tools.values():
-            for tag in tool.tags or []:
-                if tag not in stats["tools_by_tag"]:
-                    stats["tools_by_tag"][tag] = 0
-                stats["tools_by_tag"][tag] += 1
-        
-        return stats
     
     async def close(self):
-        """Close the HTTP client"""
+        """Stop background tasks and close the HTTP client"""
+        for task in (self._opa_batcher, self._health_refresher):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._opa_batcher = None
+        self._health_refresher = None
+        
+        # Fail any still-queued checks closed rather than leaving callers waiting
+        while not self._opa_queue.empty():
+            _, future = self._opa_queue.get_nowait()
+            if not future.done():
+                future.set_result(False)
+        
         await self._client.aclose()
 
 
-# Global instance
-tool_gateway = ToolGateway()
-
-
 # FastAPI integration
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+
 
-app = FastAPI(title="Tool Gateway")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the gateway (and its HTTP client) on the serving loop and close it on shutdown"""
+    gateway = ToolGateway()
+    await gateway.start()
+    app.state.gateway = gateway
+    try:
+        yield
+    finally:
+        await gateway.close()
+
+
+app = FastAPI(title="Tool Gateway", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -430,9 +720,33 @@ app.add_middleware(
 )
 
 
+def _gateway(request: Request) -> ToolGateway:
+    return request.app.state.gateway
+
+
+def _body_decoder(tp: type) -> Callable[[bytes], Any]:
+    """JSON body -> dataclass decoder: msgspec when installed, else pydantic"""
+    if msgspec is not None:
+        return msgspec.json.Decoder(tp).decode
+    return TypeAdapter(tp).validate_json
+
+
+_DECODE_ERRORS = (ValidationError,) + ((msgspec.MsgspecError,) if msgspec is not None else ())
+_decode_tool_call = _body_decoder(ToolCall)
+_decode_tool_contract = _body_decoder(ToolContract)
+
+
+async def _decode_body(request: Request, decode: Callable[[bytes], Any]) -> Any:
+    try:
+        return decode(await request.body())
+    except _DECODE_ERRORS as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @app.post("/tools/call")
-async def call_tool_endpoint(tool_call: ToolCall):
+async def call_tool_endpoint(request: Request, tool_gateway: ToolGateway = Depends(_gateway)):
     """Tool call endpoint"""
+    tool_call = await _decode_body(request, _decode_tool_call)
     try:
         response = await tool_gateway.call_tool(tool_call)
         return response
@@ -441,17 +755,15 @@ async def call_tool_endpoint(tool_call: ToolCall):
 
 
 @app.get("/tools")
-async def list_tools():
+async def list_tools(tool_gateway: ToolGateway = Depends(_gateway)):
     """List available tools"""
-    return {
-        "tools": {name: asdict(tool) for name, tool in tool_gateway.tools.items()},
-        "health_status": {name: status.value for name, status in tool_gateway.health_status.items()}
-    }
+    return Response(content=tool_gateway.tools_json(), media_type="application/json")
 
 
 @app.post("/tools/register")
-async def register_tool_endpoint(tool: ToolContract):
+async def register_tool_endpoint(request: Request, tool_gateway: ToolGateway = Depends(_gateway)):
     """Register a new tool"""
+    tool = await _decode_body(request, _decode_tool_contract)
     success = await tool_gateway.register_tool(tool)
     if not success:
         raise HTTPException(status_code=400, detail="Failed to register tool")
@@ -459,24 +771,24 @@ async def register_tool_endpoint(tool: ToolContract):
 
 
 @app.get("/tools/stats")
-async def get_tool_stats():
+async def get_tool_stats(tool_gateway: ToolGateway = Depends(_gateway)):
     """Get tool gateway statistics"""
     return await tool_gateway.get_tool_stats()
 
 
 @app.get("/tools/{tool_name}/health")
-async def check_tool_health(tool_name: str):
+async def check_tool_health(tool_name: str, tool_gateway: ToolGateway = Depends(_gateway)):
     """Check health of a specific tool"""
     status = await tool_gateway.health_check(tool_name)
     return {"tool": tool_name, "status": status.value}
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(tool_gateway: ToolGateway = Depends(_gateway)):
     """Health check endpoint"""
     return {"status": "healthy", "tools": len(tool_gateway.tools)}
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8088)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8088, loop="uvloop", http="httptools")
\ No newline at end of file
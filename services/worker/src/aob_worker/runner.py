@@ -1,7 +1,7 @@
 
 from __future__ import annotations
 import asyncio, os, random, sys
-from typing import Optional
+from typing import List, Optional
 
 from agentic_core.bus import AbstractEventBus
 from agentic_core.events import Event
@@ -17,6 +17,11 @@ try:
 except Exception:
     KafkaBus = None  # type: ignore
 
+try:
+    import uvloop
+except Exception:
+    uvloop = None  # type: ignore
+
 
 async def build_store() -> Optional[AbstractEventStore]:
     dsn = os.getenv("AOB_POSTGRES_DSN")
@@ -35,26 +40,52 @@ async def build_bus() -> Optional[AbstractEventBus]:
     return KafkaBus(topic=topic, bootstrap_servers=bs)
 
 
+async def publish_batch(bus: AbstractEventBus, items: List[Event], concurrency: int) -> List[str]:
+    """Publish via the bus's batch path; returns ids that were delivered"""
+    results = await bus.publish_many(items, max_inflight=concurrency)
+    delivered = [evt.id for evt, ok in zip(items, results) if ok]
+    if len(delivered) < len(items):
+        print(f"[worker] publish failed for {len(items) - len(delivered)}/{len(items)} events", file=sys.stderr)
+    return delivered
+
+
+def next_backoff(rng: random.Random, base: float, prev: float, cap: float) -> float:
+    """Decorrelated jitter: each delay is drawn from [base, 3 * previous delay], capped"""
+    return min(cap, rng.uniform(base, prev * 3))
+
+
 async def drain_loop(store: AbstractEventStore, bus: AbstractEventBus) -> None:
     base_delay = float(os.getenv("AOB_OUTBOX_POLL_SECS", "1.0"))
     batch = int(os.getenv("AOB_OUTBOX_BATCH", "100"))
+    concurrency = int(os.getenv("AOB_OUTBOX_CONCURRENCY", "32"))
+    idle_cap = base_delay * 5
+    rng = random.Random()
+    delay = base_delay
     while True:
         try:
             items = await store.fetch_outbox(batch)  # type: ignore[attr-defined]
             if items:
-                for evt in items:
-                    await bus.publish(evt)
-                await store.mark_outbox_delivered([e.id for e in items])  # type: ignore[attr-defined]
-                # small jitter after a successful publish burst
-                await asyncio.sleep(0.1)
+                # failed publishes stay undelivered and are retried on a later drain
+                delivered = await publish_batch(bus, items, concurrency)
+                await store.mark_outbox_delivered(delivered)  # type: ignore[attr-defined]
+                if not delivered:
+                    # the bus is rejecting everything; back off like any other transient error
+                    delay = next_backoff(rng, base_delay, delay, 10.0)
+                    await asyncio.sleep(delay)
+                    continue
+                delay = base_delay
+                # a full batch means a backlog is likely; keep draining without sleeping
+                if len(items) < batch:
+                    await asyncio.sleep(0.1)
             else:
-                # backoff with jitter when idle
-                delay = base_delay * (1.0 + random.random())
-                await asyncio.sleep(delay)
+                # wait for an outbox insert; the jittered timeout is only a fallback poll
+                delay = next_backoff(rng, base_delay, delay, idle_cap)
+                await store.wait_for_outbox(delay)  # type: ignore[attr-defined]
         except Exception as e:
-            # transient error; exponential backoff capped
+            # transient error; backoff with decorrelated jitter, capped
             print(f"[worker] outbox drain error: {e}", file=sys.stderr)
-            await asyncio.sleep(min(10.0, base_delay * 2 * (1.0 + random.random())))
+            delay = next_backoff(rng, base_delay, delay, 10.0)
+            await asyncio.sleep(delay)
 
 
 async def main() -> None:
@@ -65,8 +96,13 @@ async def main() -> None:
         while True:
             print("[worker] waiting for store/bus configuration...", file=sys.stderr)
             await asyncio.sleep(15)
-    await drain_loop(store, bus)
+    try:
+        await drain_loop(store, bus)
+    finally:
+        await store.close()
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
     asyncio.run(main())
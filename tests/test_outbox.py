@@ -0,0 +1,53 @@
+
+import asyncio, os, sys
+import pytest
+from agentic_core import InMemoryBus, InMemoryStore
+from agentic_core.events import Event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "worker", "src"))
+
+from aob_worker.runner import drain_loop
+
+class FlakyBus(InMemoryBus):
+    def __init__(self, fail_ids):
+        super().__init__()
+        self.fail_ids = set(fail_ids)
+
+    async def publish(self, evt: Event) -> None:
+        if evt.id in self.fail_ids:
+            raise RuntimeError("broker unavailable")
+        await super().publish(evt)
+
+def _evt(i: int) -> Event:
+    return Event(type="t", correlation_id="c", payload={"i": i}, ts=0.0, id=f"e{i}")
+
+@pytest.mark.asyncio
+async def test_publish_many_reports_per_event_delivery():
+    bus = FlakyBus({"e1", "e3"})
+    results = await bus.publish_many([_evt(i) for i in range(5)], max_inflight=2)
+    assert results == [True, False, True, False, True]
+    assert bus._q.qsize() == 3
+
+@pytest.mark.asyncio
+async def test_drain_loop_marks_only_delivered_events():
+    store, bus = InMemoryStore(), FlakyBus({"e2"})
+    for i in range(4):
+        await store.append_with_outbox(_evt(i))
+    task = asyncio.create_task(drain_loop(store, bus))
+    try:
+        for _ in range(100):
+            if len(await store.fetch_outbox()) < 4:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+    assert [e.id for e in await store.fetch_outbox()] == ["e2"]
+    assert bus._q.qsize() == 3
+
+@pytest.mark.asyncio
+async def test_wait_for_outbox_wakes_on_insert():
+    store = InMemoryStore()
+    waiter = asyncio.create_task(store.wait_for_outbox(30))
+    await asyncio.sleep(0)
+    await store.append_with_outbox(_evt(0))
+    await asyncio.wait_for(waiter, 1)
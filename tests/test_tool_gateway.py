@@ -0,0 +1,23 @@
+
+import asyncio, os, sys
+import pytest
+
+pytest.importorskip("jsonschema")
+pytest.importorskip("fastapi")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "services", "tool_gateway", "src"))
+
+from fastapi.testclient import TestClient
+from tool_gateway.app import app, call_tool_endpoint, ToolGateway
+
+def test_gateway_routes_are_served():
+    endpoints = {r.path: r.endpoint for r in app.routes if hasattr(r, "endpoint")}
+    assert endpoints["/tools/call"] is call_tool_endpoint
+
+    gateway = ToolGateway()
+    app.state.gateway = gateway
+    try:
+        resp = TestClient(app).get("/tools/stats")
+        assert resp.status_code == 200
+        assert resp.json()["total_tools"] == len(gateway.tools)
+    finally:
+        asyncio.run(gateway.close())